@@ -1,5 +1,10 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import Dict, Any, List
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Any, List, Optional, Set
+import asyncio
+import uuid
+from collections import OrderedDict
+from . import websocket
+from ..config import settings
 from ..services.claude_service import claude_service
 from ..models.card import Card, DealRecommendation
 import logging
@@ -8,6 +13,28 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/claude", tags=["claude"])
 
+# Background analyses are not latency sensitive, so they go through the
+# Message Batches API (half the cost of /messages) instead of one call each.
+BATCH_WINDOW_SECS = 30
+BATCH_MAX_REQUESTS = 100
+BATCH_POLL_SECS = 15
+# Finished (and pending) analyses kept for GET /quick-analysis/{custom_id}
+BATCH_RESULTS_MAX = 1000
+
+_pending_batch: List[Dict[str, Any]] = []
+_batch_sids: Dict[str, Optional[str]] = {}  # custom_id -> Socket.IO sid to notify
+_batch_timer: Optional[asyncio.Task] = None
+# custom_id -> analysis, None while its batch is still running; oldest first
+_batch_results: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+# Strong references to submit/poll tasks: the event loop only keeps weak ones
+_background_tasks: Set[asyncio.Task] = set()
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
 @router.get("/status")
 async def get_claude_status():
     """Check if Claude service is available."""
@@ -115,11 +142,56 @@ async def analyze_market_trends(sales_data: Dict[str, Any]):
         logger.error(f"Market trends analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Trends analysis failed: {str(e)}")
 
+@router.post("/card-bundle")
+async def analyze_card_bundle(request_data: Dict[str, Any]):
+    """
+    Card analysis, deal recommendation and market trends from a single Claude call.
+    
+    Cheaper and faster than calling /analyze-card, /deal-recommendation and
+    /market-trends separately for the same card.
+    
+    Expects:
+    - card_data: Card information
+    - current_bid: Current auction price
+    - recent_sales: List of recent sale records (optional)
+    """
+    if not claude_service.is_available():
+        raise HTTPException(status_code=503, detail="Claude service not available")
+    
+    card_data = request_data.get("card_data", {})
+    current_bid = request_data.get("current_bid", 0)
+    recent_sales = request_data.get("recent_sales", [])
+    
+    if not current_bid:
+        raise HTTPException(status_code=400, detail="current_bid is required")
+    
+    try:
+        bundle = await claude_service.analyze_card_bundle(card_data, current_bid, recent_sales)
+        
+        if all("error" in section for section in bundle.values()):
+            raise HTTPException(status_code=500, detail=bundle["analysis"]["error"])
+        
+        return {
+            "success": True,
+            **bundle,
+            "card_data": card_data,
+            "current_bid": current_bid
+        }
+    
+    except Exception as e:
+        logger.error(f"Bundled card analysis failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Bundled analysis failed: {str(e)}")
+
 @router.post("/quick-analysis")
-async def quick_card_analysis(background_tasks: BackgroundTasks, card_data: Dict[str, Any]):
+async def quick_card_analysis(card_data: Dict[str, Any]):
     """
     Quick analysis combining card identification, pricing, and AI insights.
     This would typically be called after OCR processing.
+    
+    The analysis is queued for the next Message Batch. Poll
+    GET /claude/quick-analysis/{custom_id} with the returned custom_id for the
+    result; it is held by the worker that queued it. If `sid` names a Socket.IO
+    client, the result is also emitted to it as `background_analysis`.
     """
     if not claude_service.is_available():
         # Return basic analysis without AI insights
@@ -134,36 +206,124 @@ async def quick_card_analysis(background_tasks: BackgroundTasks, card_data: Dict
         }
     
     try:
-        # Run Claude analysis in background for faster response
-        background_tasks.add_task(
-            _process_full_analysis,
-            card_data
-        )
+        # Queue for the next Message Batches submission (no work on the request path)
+        custom_id = _queue_for_batch(card_data, card_data.get("sid"))
         
         # Return immediate response
         return {
             "success": True,
             "claude_available": True,
             "status": "processing",
-            "message": "AI analysis started - results will be available via WebSocket"
+            "custom_id": custom_id,
+            "message": f"AI analysis queued - poll GET /claude/quick-analysis/{custom_id} for the result"
         }
     
     except Exception as e:
         logger.error(f"Quick analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-async def _process_full_analysis(card_data: Dict[str, Any]):
-    """Background task for full card analysis."""
+def _queue_for_batch(card_data: Dict[str, Any], sid: Optional[str]) -> str:
+    """Add a card analysis to the pending batch and return its custom_id."""
+    global _batch_timer
+    custom_id = f"analysis-{uuid.uuid4()}"
+    _pending_batch.append({
+        "custom_id": custom_id,
+        "params": {
+            "model": settings.CLAUDE_MODEL,
+            "max_tokens": settings.CLAUDE_MAX_TOKENS,
+            "messages": [
+                {"role": "user", "content": claude_service._build_card_analysis_prompt(card_data)}
+            ],
+        },
+    })
+    _batch_sids[custom_id] = sid
+    _store_result(custom_id, None)
+
+    if len(_pending_batch) >= BATCH_MAX_REQUESTS:
+        _spawn(_submit_pending_batch())
+    elif _batch_timer is None or _batch_timer.done():
+        _batch_timer = asyncio.create_task(_submit_after_window())
+    return custom_id
+
+async def _submit_after_window():
+    await asyncio.sleep(BATCH_WINDOW_SECS)
+    await _submit_pending_batch()
+
+async def _submit_pending_batch():
+    """Send everything queued so far as one Message Batch and start polling it."""
+    global _pending_batch
+    if not _pending_batch:
+        return
+    requests, _pending_batch = _pending_batch, []
+    sids = {r["custom_id"]: _batch_sids.pop(r["custom_id"], None) for r in requests}
+
     try:
-        # This would typically send results via WebSocket
-        analysis = await claude_service.analyze_card_data(card_data)
-        logger.info(f"Background analysis completed for {card_data.get('player_name')}")
-        
-        # TODO: Send results via WebSocket to frontend
-        # await websocket_manager.broadcast_analysis_result(analysis)
-        
+        batch = await claude_service.client.messages.batches.create(requests=requests)
+        logger.info(f"Submitted analysis batch {batch.id} ({len(requests)} requests)")
+        _spawn(_poll_batch(batch.id, sids))
     except Exception as e:
-        logger.error(f"Background analysis failed: {str(e)}")
+        logger.error(f"Batch submission failed: {str(e)}")
+        await _fail_batch(sids, f"Analysis batch submission failed: {str(e)}")
+
+async def _poll_batch(batch_id: str, sids: Dict[str, Optional[str]]):
+    """Wait for a batch to end, then emit each result to the client that asked for it."""
+    client = claude_service.client
+    try:
+        while True:
+            batch = await client.messages.batches.retrieve(batch_id)
+            if batch.processing_status == "ended":
+                break
+            await asyncio.sleep(BATCH_POLL_SECS)
+
+        results = [entry async for entry in await client.messages.batches.results(batch_id)]
+    except Exception as e:
+        logger.error(f"Batch {batch_id} polling failed: {str(e)}")
+        await _fail_batch(sids, f"Analysis batch failed: {str(e)}")
+        return
+
+    for entry in results:
+        if entry.result.type == "succeeded":
+            analysis = claude_service._parse_analysis_response(entry.result.message.content[0].text)
+        else:
+            analysis = {"error": f"Analysis {entry.result.type}"}
+        logger.info(f"Background analysis {entry.custom_id} completed")
+        await _deliver(entry.custom_id, sids.get(entry.custom_id), analysis)
+
+async def _fail_batch(sids: Dict[str, Optional[str]], message: str):
+    """Record an error for every analysis in a failed batch, so pollers stop waiting."""
+    for custom_id, sid in sids.items():
+        await _deliver(custom_id, sid, {"error": message})
+
+def _store_result(custom_id: str, analysis: Optional[Dict[str, Any]]):
+    _batch_results[custom_id] = analysis
+    _batch_results.move_to_end(custom_id)
+    while len(_batch_results) > BATCH_RESULTS_MAX:
+        _batch_results.popitem(last=False)
+
+async def _deliver(custom_id: str, sid: Optional[str], analysis: Dict[str, Any]):
+    """Store a finished analysis for polling and emit it to its client, if one was given."""
+    _store_result(custom_id, analysis)
+    if sid and websocket.sio is not None:
+        await websocket.sio.emit(
+            "background_analysis",
+            {"custom_id": custom_id, "analysis": analysis},
+            to=sid
+        )
+
+@router.get("/quick-analysis/{custom_id}")
+async def get_quick_analysis(custom_id: str):
+    """Result of a queued quick analysis: processing, complete or failed."""
+    if custom_id not in _batch_results:
+        raise HTTPException(status_code=404, detail="Unknown or expired analysis id")
+    analysis = _batch_results[custom_id]
+    if analysis is None:
+        return {"success": True, "custom_id": custom_id, "status": "processing"}
+    return {
+        "success": "error" not in analysis,
+        "custom_id": custom_id,
+        "status": "failed" if "error" in analysis else "complete",
+        "analysis": analysis,
+    }
 
 @router.get("/usage-stats")
 async def get_usage_stats():
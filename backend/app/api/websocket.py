@@ -1,60 +1,418 @@
+import asyncio
+import itertools
+import json
 import logging
-import re
 import time
 import uuid
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from app.config import settings
 from app.services.ocr_service import ocr_service
 from app.services.pricing_service import pricing_service
 from app.services.claude_service import claude_service
 from app.services.roi_calculator import roi_calculator
-from app.services.screen_capture import screen_capture, vod_replay
+from app.services.screen_capture import ScreenCaptureService, VODReplayService
 from app.services.audio_service import audio_service
 from app.services.session_log_service import session_log
+from app.services.whatsnot_parser import calculate_detection_confidence, parse_frame_text
+from app.utils.image_processing import frame_dhash, hamming_distance
 
 logger = logging.getLogger(__name__)
 
 # Injected by main.py via init_socketio()
 sio: Any = None
 
-# Per-session state shared across the capture loop
-_session_state: Dict[str, Any] = {
-    "last_known_card": None,
-    "last_known_timestamp": None,
-    "session_id": None,
-}
+# Per-client state, keyed by Socket.IO sid. Each client gets its own capture and
+# VOD replay so one client's stop/disconnect never halts another's stream.
+_session_state: Dict[str, Dict[str, Any]] = {}
+_captures: Dict[str, ScreenCaptureService] = {}
+_vod_replays: Dict[str, VODReplayService] = {}
 
 LAST_KNOWN_CARD_TTL_SECONDS = 30
 
+# With REDIS_URL set, the last-known card lives in Redis (native TTL) so every
+# worker sees the same value; otherwise it stays in _session_state.
+_redis: Any = None
+
+# Frames whose dHash is within this many bits of the last analysed frame reuse
+# its result instead of re-running OCR / pricing / Claude
+FRAME_HASH_DISTANCE_THRESHOLD = 4
+
+# Latest preview frame per client, served on demand by `request_frame`
+_last_frame_cache: Dict[str, Dict[str, Any]] = {}
+_last_preview_hash: Dict[str, int] = {}
 
-def _fuse_identities(
+# Short-lived pricing / Claude results keyed by card identity. A card usually sits
+# on screen for many processed frames; this skips the repeat lookups.
+ANALYSIS_CACHE_TTL_SECONDS = 30
+_ANALYSIS_CACHE_MAX = 256
+_CARD_FIELDS = ("player_name", "year", "set_name", "card_number", "grade", "rookie")
+_CARD_IDENTITY_FIELDS = ("player_name", "year", "grade", "card_number", "set_name")
+
+_pricing_cache: Dict[Tuple, Tuple[float, Dict]] = {}
+_claude_cache: Dict[Tuple, Tuple[float, Dict]] = {}
+
+# Results used when OCR / pricing fail. Empty tuples and a read-only card_info
+# keep the shared templates from being mutated through a shallow copy.
+_OCR_FALLBACK: Dict[str, Any] = {
+    "texts": (), "confidence": 0.0, "card_info": MappingProxyType({}), "text": "", "ocr_engine": "",
+}
+_PRICING_FALLBACK: Dict[str, Any] = {
+    "count": 0, "prices": (), "average": 0.0, "median": 0.0, "query_used": "",
+}
+
+# Session-log writes are queued and flushed in batches by a background task, so
+# SQLite I/O never runs on the event loop
+LOG_QUEUE_MAX = 1024
+LOG_BATCH_MAX = 64
+_log_queue: "asyncio.Queue[Tuple[str, Dict]]" = asyncio.Queue(maxsize=LOG_QUEUE_MAX)
+_log_writer_task: Optional[asyncio.Task] = None
+
+def _merge_card_fields(
+    card_info: Dict,
     ocr_card_info: Dict,
     audio_attrs: Dict,
     ocr_confidence: float,
     audio_confidence: float,
 ) -> Dict:
-    """Merge OCR and audio attributes using confidence weighting.
+    """Merge the parsed card with the OCR engine's own fields and audio attributes.
 
-    For each field: if OCR is missing → take audio.
-    If both present and audio is stronger → audio wins.
+    Per field, in one pass: a missing parsed value takes the OCR engine's; then,
+    when any confidence is present, a still-missing value takes audio's, and audio
+    overrides outright when it carries more than half the combined confidence.
     """
-    fused = dict(ocr_card_info)
+    merged = dict(card_info)
     total = ocr_confidence + audio_confidence
-    if total <= 0:
-        return fused
-    audio_weight = audio_confidence / total
+    use_audio = total > 0
+    audio_wins = use_audio and audio_confidence / total > 0.5
+
+    for field in _CARD_FIELDS:
+        value = merged.get(field) or ocr_card_info.get(field) or merged.get(field)
+        audio_val = audio_attrs.get(field) if use_audio else None
+        if audio_val and (not value or audio_wins):
+            value = audio_val
+        merged[field] = value
+
+    if use_audio:
+        merged["audio_confidence"] = audio_confidence
+    return merged
+
+
+def _card_key(card_info: Dict) -> Tuple:
+    return tuple(card_info.get(f) for f in _CARD_IDENTITY_FIELDS)
+
+
+def _cache_get(cache: Dict[Tuple, Tuple[float, Dict]], key: Tuple, now: float) -> Optional[Dict]:
+    entry = cache.get(key)
+    if entry and (now - entry[0]) < ANALYSIS_CACHE_TTL_SECONDS:
+        return entry[1]
+    return None
+
+
+def _cache_purge(cache: Dict[Tuple, Tuple[float, Dict]], now: float) -> None:
+    for stale in [k for k, (ts, _) in cache.items() if (now - ts) >= ANALYSIS_CACHE_TTL_SECONDS]:
+        del cache[stale]
+
+
+def _cache_put(cache: Dict[Tuple, Tuple[float, Dict]], key: Tuple, now: float, value: Dict) -> None:
+    if len(cache) >= _ANALYSIS_CACHE_MAX:
+        _cache_purge(cache, now)
+        if len(cache) >= _ANALYSIS_CACHE_MAX:
+            del cache[next(iter(cache))]  # oldest insertion
+    cache[key] = (now, value)
+
+
+async def _emit_preview(
+    sid: str, frame_array, encode_preview: Callable[[], bytes], frame_count: int, force: bool = False
+) -> None:
+    """Forward every PREVIEW_EVERY_N_FRAMES-th frame (or a forced one), skipping unchanged ones.
+
+    Frames are only JPEG-encoded when actually sent. A copy of the latest frame
+    is kept so `request_frame` can encode it on demand: the capture loop reuses
+    its frame buffer and does not wait for pulls.
+    """
+    _last_frame_cache[sid] = {"frame": frame_array.copy(), "timestamp": frame_count}
+    if not force and frame_count % settings.PREVIEW_EVERY_N_FRAMES != 0:
+        return
+    # Resize + encode off the event loop (OpenCV/libjpeg release the GIL). The
+    # capture loop awaits this push, so its frame buffer can't change meanwhile.
+    frame_jpeg = await asyncio.to_thread(encode_preview)
+    frame_hash = hash(frame_jpeg)
+    if _last_preview_hash.get(sid) == frame_hash:
+        return
+    _last_preview_hash[sid] = frame_hash
+    await sio.emit("frame", {"image": frame_jpeg, "timestamp": frame_count}, to=sid)
+
+
+def _new_session_state() -> Dict[str, Any]:
+    return {
+        "last_known_card": None,
+        "last_known_timestamp": None,
+        "session_id": None,
+        "last_frame_hash": None,
+        "last_result": None,
+    }
+
+
+async def _reuse_if_unchanged(sid: str, state: Dict[str, Any], frame_array, frame_count: int) -> bool:
+    """Skip analysis when the frame looks like the last analysed one.
+
+    Re-emits the previous result (if there was one) with the new timestamp and
+    `reused` set, so the client refreshes it rather than adding a history entry,
+    and returns True; otherwise records the new frame hash and returns False.
+    """
+    try:
+        frame_hash = frame_dhash(frame_array)
+    except Exception as e:
+        logger.debug("Frame hash failed: %s", e)
+        return False
+    last_hash = state.get("last_frame_hash")
+    if last_hash is not None and hamming_distance(frame_hash, last_hash) < FRAME_HASH_DISTANCE_THRESHOLD:
+        last_result = state.get("last_result")
+        if last_result is not None:
+            await sio.emit("analysis_result", dict(last_result, timestamp=frame_count, reused=True), to=sid)
+        return True
+    state["last_frame_hash"] = frame_hash
+    state["last_result"] = None
+    return False
+
+
+def _get_session_state(sid: str) -> Dict[str, Any]:
+    state = _session_state.get(sid)
+    if state is None:
+        state = _session_state[sid] = _new_session_state()
+    return state
+
+
+def _get_capture(sid: str) -> ScreenCaptureService:
+    capture = _captures.get(sid)
+    if capture is None:
+        capture = _captures[sid] = ScreenCaptureService(settings.CAPTURE_COLOR_MODE)
+    return capture
+
+
+def _get_vod_replay(sid: str) -> VODReplayService:
+    replay = _vod_replays.get(sid)
+    if replay is None:
+        replay = _vod_replays[sid] = VODReplayService()
+    return replay
+
+
+def _get_redis():
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        import redis.asyncio as aioredis
+        _redis = aioredis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+async def _remember_card(sid: str, state: Dict[str, Any], card_info: Dict, now: float) -> None:
+    redis = _get_redis()
+    if redis is not None:
+        try:
+            await redis.set(f"lkc:{sid}", json.dumps(card_info), ex=LAST_KNOWN_CARD_TTL_SECONDS)
+            return
+        except Exception as e:
+            logger.warning("Redis write failed, keeping last-known card in memory: %s", e)
+    state["last_known_card"] = card_info
+    state["last_known_timestamp"] = now
+
+
+async def _recall_card(sid: str, state: Dict[str, Any], now: float) -> Optional[Dict]:
+    """The last identified card for this client, if still within LAST_KNOWN_CARD_TTL_SECONDS."""
+    redis = _get_redis()
+    if redis is not None:
+        try:
+            raw = await redis.get(f"lkc:{sid}")
+            if raw:
+                return json.loads(raw)
+        except Exception as e:
+            logger.warning("Redis read failed, using in-memory last-known card: %s", e)
+    last = state.get("last_known_card")
+    last_ts = state.get("last_known_timestamp")
+    if last and last_ts is not None and (now - last_ts) < LAST_KNOWN_CARD_TTL_SECONDS:
+        return last
+    return None
+
+
+async def _log_writer() -> None:
+    while True:
+        entries = [await _log_queue.get()]
+        while len(entries) < LOG_BATCH_MAX and not _log_queue.empty():
+            entries.append(_log_queue.get_nowait())
+        try:
+            await asyncio.to_thread(session_log.log_batch, entries)
+        except Exception as e:
+            logger.warning("Session log write failed (%d entries): %s", len(entries), e)
+
+
+def _queue_session_log(session_id: str, payload: Dict) -> None:
+    global _log_writer_task
+    if _log_writer_task is None or _log_writer_task.done():
+        _log_writer_task = asyncio.ensure_future(_log_writer())
+    try:
+        _log_queue.put_nowait((session_id, payload))
+    except asyncio.QueueFull:
+        logger.warning("Session log queue full — dropping entry for %s", session_id)
+
+
+async def _stream_deal_recommendation(sid: str, card_info: Dict, current_bid: float, frame_count: int) -> Dict:
+    """Forward Claude's recommendation to the client as it is generated.
+
+    Emits `claude_chunk` per text chunk, then `claude_done` with the parsed result,
+    which is also returned for the analysis_result payload.
+    """
+    if not claude_service.is_available():
+        return {"error": "Claude service not available"}
+
+    chunks = []
+    async for chunk in claude_service.generate_deal_recommendation_stream(card_info, current_bid):
+        chunks.append(chunk)
+        await sio.emit("claude_chunk", {"text": chunk, "timestamp": frame_count}, to=sid)
 
-    for field in ("grade", "year", "set_name", "rookie"):
-        ocr_val = ocr_card_info.get(field)
-        audio_val = audio_attrs.get(field)
-        if not ocr_val and audio_val:
-            fused[field] = audio_val
-        elif ocr_val and audio_val and audio_weight > 0.5:
-            fused[field] = audio_val
+    claude_analysis = claude_service._parse_recommendation_response("".join(chunks))
+    await sio.emit("claude_done", {"claude_analysis": claude_analysis, "timestamp": frame_count}, to=sid)
+    return claude_analysis
 
-    fused["audio_confidence"] = audio_confidence
-    return fused
+
+async def _run_analysis_pipeline(
+    sid: str, state: Dict[str, Any], frame_array, frame_count: int, is_vod: bool = False
+) -> None:
+    """OCR → parse → fuse → pricing → ROI → Claude → emit → log for one frame.
+
+    Shared by live capture and VOD replay. Live mode also emits scanning /
+    low-confidence status pings, carries the last-known card forward across
+    frames without a player, and streams Claude's output; VOD mode awaits one
+    complete Claude recommendation per analysed frame.
+    """
+    log_prefix = "VOD " if is_vod else ""
+    # One clock read per frame for every TTL check; monotonic so NTP steps can't
+    # expire or resurrect entries
+    now = time.monotonic()
+
+    # --- OCR ---
+    try:
+        ocr_result = await ocr_service.extract_text_dual_region(frame_array)
+    except Exception as e:
+        logger.warning("%sOCR failed on frame %d: %s", log_prefix, frame_count, e)
+        # Not ocr_service.ocr_engine: that would load the model here, on the event loop
+        ocr_result = {**_OCR_FALLBACK, "ocr_engine": ocr_service._ocr_engine or "unknown"}
+
+    ocr_text = ocr_result.get("text", "")
+
+    async def emit_scanning():
+        if not is_vod and frame_count % 30 == 0:
+            await sio.emit("status", {
+                "message": "Scanning for cards...",
+                "ocr_text": ocr_text,
+                "timestamp": frame_count,
+            }, to=sid)
+
+    # Blurry / transition frame — not worth parsing, let alone pricing
+    if ocr_result.get("confidence", 0.0) < settings.MIN_OCR_CONFIDENCE:
+        await emit_scanning()
+        return
+
+    # --- Card / auction parsing ---
+    card_info, auction_info = parse_frame_text(ocr_text)
+
+    # --- Merge OCR-engine fields and audio attributes into the parsed card ---
+    audio_data = audio_service.get_latest()
+    card_info = _merge_card_fields(
+        card_info,
+        ocr_result.get("card_info", {}),
+        audio_data.get("attributes", {}),
+        ocr_result.get("confidence", 0.0),
+        audio_data.get("audio_confidence", 0.0),
+    )
+    card_info["ocr_engine"] = ocr_result.get("ocr_engine", "unknown")
+
+    # --- Last-known-card TTL (live only) ---
+    if not is_vod:
+        if card_info.get("player_name"):
+            await _remember_card(sid, state, card_info, now)
+        else:
+            last = await _recall_card(sid, state, now)
+            if last:
+                card_info = last  # carry forward within TTL
+
+    # If still no card, emit a status ping and skip the expensive lookups
+    if not card_info.get("player_name"):
+        await emit_scanning()
+        return
+
+    # Too little detected to trust — report it, but skip the expensive lookups
+    detection_confidence = calculate_detection_confidence(card_info, auction_info)
+    if detection_confidence < settings.MIN_DETECTION_CONFIDENCE:
+        if not is_vod:
+            await sio.emit("status", {
+                "message": "Low-confidence detection",
+                "card_info": card_info,
+                "confidence": detection_confidence,
+                "timestamp": frame_count,
+            }, to=sid)
+        return
+
+    # --- Pricing and Claude (independent round trips, run concurrently) ---
+    card_key = _card_key(card_info)
+    current_bid = auction_info.get("current_bid", 0)
+
+    async def fetch_pricing() -> Dict:
+        pricing = _cache_get(_pricing_cache, card_key, now)
+        if pricing is not None:
+            return pricing
+        try:
+            pricing = await pricing_service.get_card_prices(card_info)
+            _cache_put(_pricing_cache, card_key, now, pricing)
+            return pricing
+        except Exception as e:
+            logger.error("%sPricing fetch failed: %s", log_prefix, e)
+            return dict(_PRICING_FALLBACK)
+
+    # Live: streamed to the client as it generates; VOD: one plain call per frame
+    async def fetch_claude() -> Dict:
+        # Bid bucketed to the dollar — OCR jitter in the cents shouldn't re-ask Claude
+        claude_key = card_key + (round(current_bid),)
+        analysis = _cache_get(_claude_cache, claude_key, now)
+        if analysis is not None:
+            return analysis
+        try:
+            if is_vod:
+                analysis = await claude_service.generate_deal_recommendation(card_info, current_bid)
+            else:
+                analysis = await _stream_deal_recommendation(sid, card_info, current_bid, frame_count)
+            if "error" not in analysis:
+                _cache_put(_claude_cache, claude_key, now, analysis)
+            return analysis
+        except Exception as e:
+            logger.warning("%sClaude analysis failed: %s", log_prefix, e)
+            return {}
+
+    pricing_data, claude_analysis = await asyncio.gather(fetch_pricing(), fetch_claude())
+
+    # --- ROI (never raises after refactor) ---
+    roi_analysis = roi_calculator.calculate_roi_analysis(card_info, current_bid, pricing_data)
+
+    result_payload = {
+        "card_info": card_info,
+        "auction_info": auction_info,
+        "pricing_data": pricing_data,
+        "roi_analysis": roi_analysis,
+        "claude_analysis": claude_analysis,
+        "confidence": detection_confidence,
+        "timestamp": frame_count,
+        "audio_status": {
+            "is_active": audio_service._is_running and audio_service.is_available(),
+            "audio_confidence": audio_data.get("audio_confidence", 0.0),
+            "transcript_preview": (audio_data.get("transcript") or "")[:80],
+        },
+    }
+    await sio.emit("analysis_result", result_payload, to=sid)
+    state["last_result"] = result_payload
+
+    # Persist to session log (queued — never blocks or breaks the pipeline)
+    _queue_session_log(state.get("session_id") or sid, result_payload)
 
 
 def init_socketio(sio_instance) -> None:
@@ -70,17 +428,40 @@ def _register_events() -> None:
     @sio.event
     async def connect(sid, _environ):
         logger.info("Client connected: %s", sid)
+        _session_state[sid] = _new_session_state()
         await sio.emit("connected", {"message": "Connected to card analyzer"}, to=sid)
 
     @sio.event
     async def disconnect(sid):
         logger.info("Client disconnected: %s", sid)
-        screen_capture.stop_capture()
+        capture = _captures.pop(sid, None)
+        if capture:
+            capture.stop_capture()
+            capture.close()
+        replay = _vod_replays.pop(sid, None)
+        if replay:
+            replay.stop_replay()
+        _session_state.pop(sid, None)
+        _last_frame_cache.pop(sid, None)
+        _last_preview_hash.pop(sid, None)
+        # Shared caches are bounded, but drop expired entries while we're here
+        now = time.monotonic()
+        _cache_purge(_pricing_cache, now)
+        _cache_purge(_claude_cache, now)
+
+    @sio.event
+    async def request_frame(sid):
+        """Pull the latest captured frame (for clients that want more than the pushed preview rate)."""
+        latest = _last_frame_cache.get(sid)
+        if latest:
+            image = await asyncio.to_thread(_get_capture(sid).frame_to_jpeg, latest["frame"])
+            await sio.emit("frame", {"image": image, "timestamp": latest["timestamp"]}, to=sid)
 
     @sio.event
     async def select_region(sid, data=None):
         try:
             data = data or {}
+            screen_capture = _get_capture(sid)
             top = data.get("top")
             left = data.get("left")
             width = data.get("width")
@@ -92,7 +473,8 @@ def _register_events() -> None:
                     width=int(width), height=int(height),
                 )
             else:
-                region = screen_capture.select_capture_region()
+                # Selection may open a GUI; keep it off the event loop.
+                region = await asyncio.to_thread(screen_capture.select_capture_region)
 
             if region:
                 await sio.emit(
@@ -113,126 +495,46 @@ def _register_events() -> None:
     @sio.event
     async def start_analysis(sid):
         logger.info("Starting analysis for client: %s", sid)
-        audio_service.start()
+        # First start loads the Whisper model
+        await asyncio.to_thread(audio_service.start)
+        state = _get_session_state(sid)
+        screen_capture = _get_capture(sid)
 
         if not screen_capture.capture_region:
             await sio.emit("error", {"message": "Please select a capture region first"}, to=sid)
             return
 
         session_id = str(uuid.uuid4())
-        _session_state["session_id"] = session_id
+        state["session_id"] = session_id
         await sio.emit("session_started", {"session_id": session_id}, to=sid)
         logger.info("Session started: %s", session_id)
 
-        frame_count = 0
+        frames = itertools.count(1)
+        # Read once per session rather than per frame
+        process_every = settings.PROCESS_EVERY_N_FRAMES
+        capture_fps = settings.CAPTURE_FPS
 
-        async def process_frame(frame_array, frame_b64, _frame_num):
-            nonlocal frame_count
-            frame_count += 1
+        async def process_frame(frame_array, encode_preview, _frame_num):
+            frame_count = next(frames)
+            # The screen just went static: this frame must not fall between the
+            # sampled ones, as no further callback arrives until it changes again
+            settled = screen_capture.frame_unchanged
 
-            # Always forward the frame for the live preview
-            await sio.emit("frame", {"image": frame_b64, "timestamp": frame_count}, to=sid)
+            # Forward the live preview at the (lower) preview rate
+            await _emit_preview(sid, frame_array, encode_preview, frame_count, force=settled)
 
             # Only run the analysis pipeline every N frames
-            if frame_count % settings.PROCESS_EVERY_N_FRAMES != 0:
+            if frame_count % process_every != 0 and not settled:
                 return
 
-            # --- OCR ---
-            try:
-                ocr_result = await ocr_service.extract_text_dual_region(frame_array)
-            except Exception as e:
-                logger.warning("OCR failed on frame %d: %s", frame_count, e)
-                ocr_result = {"texts": [], "confidence": 0.0, "card_info": {}, "text": "",
-                              "ocr_engine": ocr_service.ocr_engine}
-
-            ocr_text = ocr_result.get("text", "")
-
-            # --- Card / auction parsing ---
-            card_info = parse_whatsnot_card_info(ocr_text)
-            auction_info = parse_whatsnot_auction_info(ocr_text)
-
-            # Merge OCR card_info fields (richer regex) over the simpler _extract_card_info output
-            for key in ("player_name", "year", "set_name", "card_number", "grade", "rookie"):
-                if not card_info.get(key) and ocr_result.get("card_info", {}).get(key):
-                    card_info[key] = ocr_result["card_info"][key]
-
-            card_info["ocr_engine"] = ocr_result.get("ocr_engine", "unknown")
-
-            # --- Audio fusion ---
-            audio_data = audio_service.get_latest()
-            audio_attrs = audio_data.get("attributes", {})
-            audio_conf = audio_data.get("audio_confidence", 0.0)
-            ocr_conf = ocr_result.get("confidence", 0.0)
-            card_info = _fuse_identities(card_info, audio_attrs, ocr_conf, audio_conf)
-
-            # --- Last-known-card TTL ---
-            now = time.time()
-            if card_info.get("player_name"):
-                _session_state["last_known_card"] = card_info
-                _session_state["last_known_timestamp"] = now
-            else:
-                last = _session_state.get("last_known_card")
-                last_ts = _session_state.get("last_known_timestamp")
-                if last and last_ts and (now - last_ts) < LAST_KNOWN_CARD_TTL_SECONDS:
-                    card_info = last  # carry forward within TTL
-
-            # If still no card, emit a status ping and skip the expensive lookups
-            if not card_info.get("player_name"):
-                if frame_count % 30 == 0:
-                    await sio.emit("status", {
-                        "message": "Scanning for cards...",
-                        "ocr_text": ocr_text,
-                        "timestamp": frame_count,
-                    }, to=sid)
+            # Screen unchanged since the last analysed frame → reuse that result
+            if await _reuse_if_unchanged(sid, state, frame_array, frame_count):
                 return
 
-            # --- Pricing ---
-            try:
-                pricing_data = await pricing_service.get_card_prices(card_info)
-            except Exception as e:
-                logger.error("Pricing fetch failed: %s", e)
-                pricing_data = {"count": 0, "prices": [], "average": 0.0, "median": 0.0,
-                                "query_used": ""}
-
-            # --- ROI (never raises after refactor) ---
-            roi_analysis = roi_calculator.calculate_roi_analysis(
-                card_info, auction_info.get("current_bid", 0), pricing_data
-            )
-
-            # --- Claude ---
-            try:
-                claude_analysis = await claude_service.generate_deal_recommendation(
-                    card_info, auction_info.get("current_bid", 0)
-                )
-            except Exception as e:
-                logger.warning("Claude analysis failed: %s", e)
-                claude_analysis = {}
-
-            result_payload = {
-                "card_info": card_info,
-                "auction_info": auction_info,
-                "pricing_data": pricing_data,
-                "roi_analysis": roi_analysis,
-                "claude_analysis": claude_analysis,
-                "confidence": calculate_detection_confidence(card_info, auction_info),
-                "timestamp": frame_count,
-                "audio_status": {
-                    "is_active": audio_service.is_available() and audio_service._is_running,
-                    "audio_confidence": audio_data.get("audio_confidence", 0.0),
-                    "transcript_preview": (audio_data.get("transcript") or "")[:80],
-                },
-            }
-            await sio.emit("analysis_result", result_payload, to=sid)
-
-            # Persist to session log (non-blocking — errors must not break the pipeline)
-            try:
-                current_session_id = _session_state.get("session_id") or sid
-                session_log.log(current_session_id, result_payload)
-            except Exception as log_err:
-                logger.warning("Session log write failed: %s", log_err)
+            await _run_analysis_pipeline(sid, state, frame_array, frame_count)
 
         try:
-            await screen_capture.start_capture_stream(process_frame, fps=settings.CAPTURE_FPS)
+            await screen_capture.start_capture_stream(process_frame, fps=capture_fps)
         except Exception as e:
             await sio.emit("error", {"message": f"Failed to start capture: {str(e)}"}, to=sid)
 
@@ -240,8 +542,12 @@ def _register_events() -> None:
     async def stop_analysis(sid):
         logger.info("Stopping analysis for client: %s", sid)
         audio_service.stop()
-        screen_capture.stop_capture()
-        vod_replay.stop_replay()
+        capture = _captures.get(sid)
+        if capture:
+            capture.stop_capture()
+        replay = _vod_replays.get(sid)
+        if replay:
+            replay.stop_replay()
         await sio.emit("analysis_stopped", {"message": "Analysis stopped"}, to=sid)
 
     @sio.event
@@ -252,7 +558,7 @@ def _register_events() -> None:
             await sio.emit("error", {"message": "No video path provided"}, to=sid)
             return
         try:
-            meta = vod_replay.load_video(video_path)
+            meta = _get_vod_replay(sid).load_video(video_path)
             if meta["success"]:
                 await sio.emit("vod_loaded", meta, to=sid)
                 logger.info("VOD loaded: %s (%.1fs)", video_path, meta.get("duration_seconds", 0))
@@ -265,196 +571,35 @@ def _register_events() -> None:
     async def start_vod_replay(sid):
         """Replay the loaded VOD through the same analysis pipeline as live capture."""
         logger.info("Starting VOD replay for client: %s", sid)
-        audio_service.start()
+        # First start loads the Whisper model
+        await asyncio.to_thread(audio_service.start)
 
+        state = _get_session_state(sid)
         session_id = str(uuid.uuid4())
-        _session_state["session_id"] = session_id
+        state["session_id"] = session_id
         await sio.emit("session_started", {"session_id": session_id}, to=sid)
 
-        # Reuse the same process_frame closure shape as start_analysis
-        frame_count = 0
+        frames = itertools.count(1)
+        # Read once per session rather than per frame
+        process_every = settings.PROCESS_EVERY_N_FRAMES
+        capture_fps = settings.CAPTURE_FPS
 
-        async def process_vod_frame(frame_array, frame_b64, _frame_num):
-            nonlocal frame_count
-            frame_count += 1
-            await sio.emit("frame", {"image": frame_b64, "timestamp": frame_count}, to=sid)
+        async def process_vod_frame(frame_array, encode_preview, _frame_num):
+            frame_count = next(frames)
+            await _emit_preview(sid, frame_array, encode_preview, frame_count)
 
-            if frame_count % settings.PROCESS_EVERY_N_FRAMES != 0:
+            if frame_count % process_every != 0:
                 return
 
-            try:
-                ocr_result = await ocr_service.extract_text_dual_region(frame_array)
-            except Exception as e:
-                logger.warning("VOD OCR failed on frame %d: %s", frame_count, e)
-                ocr_result = {"texts": [], "confidence": 0.0, "card_info": {}, "text": "",
-                              "ocr_engine": ocr_service.ocr_engine}
-
-            ocr_text = ocr_result.get("text", "")
-            card_info = parse_whatsnot_card_info(ocr_text)
-            auction_info = parse_whatsnot_auction_info(ocr_text)
-
-            for key in ("player_name", "year", "set_name", "card_number", "grade", "rookie"):
-                if not card_info.get(key) and ocr_result.get("card_info", {}).get(key):
-                    card_info[key] = ocr_result["card_info"][key]
-            card_info["ocr_engine"] = ocr_result.get("ocr_engine", "unknown")
-
-            audio_data = audio_service.get_latest()
-            card_info = _fuse_identities(
-                card_info, audio_data.get("attributes", {}),
-                ocr_result.get("confidence", 0.0), audio_data.get("audio_confidence", 0.0),
-            )
-
-            if not card_info.get("player_name"):
+            if await _reuse_if_unchanged(sid, state, frame_array, frame_count):
                 return
 
-            try:
-                pricing_data = await pricing_service.get_card_prices(card_info)
-            except Exception as e:
-                logger.error("VOD pricing fetch failed: %s", e)
-                pricing_data = {"count": 0, "prices": [], "average": 0.0, "median": 0.0, "query_used": ""}
-
-            roi_analysis = roi_calculator.calculate_roi_analysis(
-                card_info, auction_info.get("current_bid", 0), pricing_data
-            )
-
-            try:
-                claude_analysis = await claude_service.generate_deal_recommendation(
-                    card_info, auction_info.get("current_bid", 0)
-                )
-            except Exception as e:
-                logger.warning("VOD Claude analysis failed: %s", e)
-                claude_analysis = {}
-
-            result_payload = {
-                "card_info": card_info,
-                "auction_info": auction_info,
-                "pricing_data": pricing_data,
-                "roi_analysis": roi_analysis,
-                "claude_analysis": claude_analysis,
-                "confidence": calculate_detection_confidence(card_info, auction_info),
-                "timestamp": frame_count,
-                "audio_status": {
-                    "is_active": audio_service.is_available() and audio_service._is_running,
-                    "audio_confidence": audio_data.get("audio_confidence", 0.0),
-                    "transcript_preview": (audio_data.get("transcript") or "")[:80],
-                },
-            }
-            await sio.emit("analysis_result", result_payload, to=sid)
-            try:
-                session_log.log(session_id, result_payload)
-            except Exception as log_err:
-                logger.warning("VOD session log write failed: %s", log_err)
+            await _run_analysis_pipeline(sid, state, frame_array, frame_count, is_vod=True)
 
         try:
-            await vod_replay.start_replay_stream(process_vod_frame, target_fps=settings.CAPTURE_FPS)
+            await _get_vod_replay(sid).start_replay_stream(process_vod_frame, target_fps=capture_fps)
             await sio.emit("vod_replay_complete", {"message": "VOD replay finished"}, to=sid)
         except Exception as e:
             await sio.emit("error", {"message": f"VOD replay error: {str(e)}"}, to=sid)
         finally:
             audio_service.stop()
-
-
-# ---------------------------------------------------------------------------
-# Parsing helpers (unchanged logic, kept here for proximity to the pipeline)
-# ---------------------------------------------------------------------------
-
-def parse_whatsnot_card_info(text: str) -> Dict:
-    card_info: Dict = {
-        "player_name": "",
-        "year": "",
-        "set_name": "",
-        "card_number": "",
-        "grade": "",
-        "grading_company": "",
-        "rookie": False,
-    }
-
-    player_match = extract_player_name(text)
-    if player_match:
-        card_info["player_name"] = player_match
-
-    year_match = re.search(r'\b(19[5-9]\d|20[0-2]\d)\b', text)
-    if year_match:
-        card_info["year"] = year_match.group(1)
-
-    grade_match = re.search(r'\b(PSA|BGS|SGC)\s*(\d+(?:\.\d+)?)\b', text, re.IGNORECASE)
-    if grade_match:
-        card_info["grading_company"] = grade_match.group(1).upper()
-        card_info["grade"] = f"{card_info['grading_company']} {grade_match.group(2)}"
-
-    card_num_match = re.search(r'#(\d+)', text)
-    if card_num_match:
-        card_info["card_number"] = card_num_match.group(1)
-
-    if any(w in text.lower() for w in ['rookie', 'rc', 'rookie card']):
-        card_info["rookie"] = True
-
-    set_name = extract_set_name(text)
-    if set_name:
-        card_info["set_name"] = set_name
-
-    return card_info
-
-
-def parse_whatsnot_auction_info(text: str) -> Dict:
-    auction_info: Dict = {
-        "current_bid": 0.0,
-        "time_remaining": "",
-        "bid_count": 0,
-        "seller": "",
-    }
-
-    bid_match = re.search(r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)', text)
-    if bid_match:
-        auction_info["current_bid"] = float(bid_match.group(1).replace(",", ""))
-
-    time_match = re.search(r'(\d+[hm]|\d+:\d+)', text)
-    if time_match:
-        auction_info["time_remaining"] = time_match.group(1)
-
-    bid_count_match = re.search(r'(\d+)\s*bid', text, re.IGNORECASE)
-    if bid_count_match:
-        auction_info["bid_count"] = int(bid_count_match.group(1))
-
-    return auction_info
-
-
-def extract_player_name(text: str) -> str:
-    patterns = [
-        r'\b([A-Z][a-z]+\s+[A-Z][a-z]+)\b',
-        r'\b([A-Z]\.\s*[A-Z][a-z]+)\b',
-    ]
-    for pattern in patterns:
-        for match in re.findall(pattern, text):
-            if not any(w in match.lower() for w in ['psa', 'bgs', 'card', 'lot', 'bid', 'time']):
-                return match
-    return ""
-
-
-def extract_set_name(text: str) -> str:
-    common_sets = [
-        'topps', 'panini', 'upper deck', 'fleer', 'donruss', 'bowman',
-        'prizm', 'select', 'optic', 'mosaic', 'chronicles',
-    ]
-    text_lower = text.lower()
-    for set_name in common_sets:
-        if set_name in text_lower:
-            idx = text_lower.find(set_name)
-            context = text[max(0, idx - 20):min(len(text), idx + len(set_name) + 20)]
-            m = re.search(rf'\b\w*{set_name}\w*\b', context, re.IGNORECASE)
-            if m:
-                return m.group(0)
-    return ""
-
-
-def calculate_detection_confidence(card_info: Dict, auction_info: Dict) -> float:
-    confidence = 0.0
-    if card_info.get("player_name"):
-        confidence += 0.4
-    if card_info.get("year"):
-        confidence += 0.2
-    if card_info.get("grade"):
-        confidence += 0.2
-    if auction_info.get("current_bid", 0) > 0:
-        confidence += 0.2
-    return min(confidence, 1.0)
@@ -12,6 +12,8 @@ class Settings:
     EBAY_APP_ID: str = os.getenv("EBAY_APP_ID", "")
     EBAY_DEV_ID: str = os.getenv("EBAY_DEV_ID", "")
     EBAY_CERT_ID: str = os.getenv("EBAY_CERT_ID", "")
+    # Finding API requests in flight at once, across all pricing lookups
+    EBAY_MAX_CONCURRENCY: int = int(os.getenv("EBAY_MAX_CONCURRENCY", "5"))
     
     # Anthropic Claude API Settings
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
@@ -24,11 +26,42 @@ class Settings:
     
     # OCR Settings
     OCR_CONFIDENCE_THRESHOLD: float = float(os.getenv("OCR_CONFIDENCE_THRESHOLD", "0.7"))
+    # Frames below these skip pricing / Claude entirely. OCR confidence is the mean
+    # of the title and bid regions, so an empty region halves it — keep this low.
+    MIN_OCR_CONFIDENCE: float = float(os.getenv("MIN_OCR_CONFIDENCE", "0.3"))
+    MIN_DETECTION_CONFIDENCE: float = float(os.getenv("MIN_DETECTION_CONFIDENCE", "0.6"))
+    # Worker processes for frame OCR (0 = run OCR on threads in the server process).
+    # Opt-in: every worker loads and holds its own copy of the OCR model.
+    OCR_PROCESS_WORKERS: int = int(os.getenv("OCR_PROCESS_WORKERS", "0"))
+    # OCR calls in flight at once (also the size of the in-process OCR thread pool)
+    OCR_CONCURRENCY: int = int(os.getenv("OCR_CONCURRENCY", str(os.cpu_count() or 2)))
+    # PaddleOCR on a CUDA GPU: run det/rec through Paddle Inference's TensorRT subgraph
+    # engine in FP16. The first start only records input shapes; TRT kicks in after.
+    OCR_USE_TENSORRT: bool = os.getenv("OCR_USE_TENSORRT", "false").lower() in ("1", "true", "yes")
+    # Run crop preprocessing (grayscale + adaptive threshold) through OpenCV's
+    # OpenCL T-API. Pays off on large crops with a real GPU/iGPU; off by default
+    # because a CPU OpenCL runtime (e.g. POCL) is slower than plain OpenCV.
+    OCR_USE_OPENCL: bool = os.getenv("OCR_USE_OPENCL", "false").lower() in ("1", "true", "yes")
+    # Run one OCR pass on a synthetic crop after loading the engine to absorb first-call setup
+    OCR_WARMUP: bool = os.getenv("OCR_WARMUP", "true").lower() in ("1", "true", "yes")
+    # Directory holding det.onnx / rec.onnx / cls.onnx (paddle2onnx exports; rec.onnx
+    # typically INT8-quantized with onnxruntime.quantization). Runs PaddleOCR on ONNX Runtime.
+    OCR_ONNX_MODEL_DIR: Optional[str] = os.getenv("OCR_ONNX_MODEL_DIR")
     
     # Screen Capture Settings
     CAPTURE_FPS: int = int(os.getenv("CAPTURE_FPS", "5"))
     PROCESS_EVERY_N_FRAMES: int = int(os.getenv("PROCESS_EVERY_N_FRAMES", "3"))
+    PREVIEW_EVERY_N_FRAMES: int = int(os.getenv("PREVIEW_EVERY_N_FRAMES", "5"))
+    # "gray" captures single-channel frames: cheaper, and OCR only needs luminance
+    # (the live preview turns grayscale too)
+    CAPTURE_COLOR_MODE: str = os.getenv("CAPTURE_COLOR_MODE", "bgr")
     
+    # Audio Settings
+    # Rolling-window transcription: better on boundary words, ~10x the Whisper CPU
+    AUDIO_STREAMING: bool = os.getenv("AUDIO_STREAMING", "false").lower() in ("1", "true", "yes")
+    # Run one silent transcription after loading Whisper to absorb first-call setup
+    WHISPER_WARMUP: bool = os.getenv("WHISPER_WARMUP", "true").lower() in ("1", "true", "yes")
+
     # Pricing Cache Settings
     PRICING_CACHE_DB: str = os.getenv("PRICING_CACHE_DB", "pricing_cache.db")
     PRICING_CACHE_TTL_HOURS: int = int(os.getenv("PRICING_CACHE_TTL_HOURS", "3"))
@@ -38,14 +71,11 @@ class Settings:
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     
-    @property
-    def has_anthropic_key(self) -> bool:
-        """Check if Anthropic API key is configured."""
-        return bool(self.ANTHROPIC_API_KEY and self.ANTHROPIC_API_KEY.startswith("sk-ant-"))
-    
-    @property
-    def has_ebay_keys(self) -> bool:
-        """Check if eBay API keys are configured."""
-        return bool(self.EBAY_APP_ID and self.EBAY_DEV_ID and self.EBAY_CERT_ID)
+    def __init__(self):
+        # Derived flags are computed once; the values above never change at runtime
+        self.has_anthropic_key: bool = bool(
+            self.ANTHROPIC_API_KEY and self.ANTHROPIC_API_KEY.startswith("sk-ant-")
+        )
+        self.has_ebay_keys: bool = bool(self.EBAY_APP_ID and self.EBAY_DEV_ID and self.EBAY_CERT_ID)
 
 settings = Settings()
\ No newline at end of file
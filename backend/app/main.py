@@ -1,13 +1,31 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import orjson
 import socketio
 from app.api import routes, websocket
 from app.config import settings
+from app.services.pricing_service import pricing_service
 from .api.claude_routes import router as claude_router
 
 
+class _OrJSON:
+    """json-module shim so python-socketio encodes packets with orjson."""
+
+    @staticmethod
+    def dumps(obj, **_kwargs) -> str:
+        return orjson.dumps(
+            obj, default=str,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        ).decode()
+
+    @staticmethod
+    def loads(s, **_kwargs):
+        return orjson.loads(s)
+
+
 # Create FastAPI app
-app = FastAPI(title="Joshinator API")
+app = FastAPI(title="Joshinator API", default_response_class=ORJSONResponse)
 app.include_router(claude_router)
 
 
@@ -20,8 +38,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create Socket.IO server
-sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+# Create Socket.IO server — with REDIS_URL set, emits are relayed through Redis
+# so any worker can reach a client connected to another worker
+client_manager = socketio.AsyncRedisManager(settings.REDIS_URL) if settings.REDIS_URL else None
+sio = socketio.AsyncServer(
+    async_mode='asgi', cors_allowed_origins='*', client_manager=client_manager, json=_OrJSON
+)
 socket_app = socketio.ASGIApp(sio, app)
 
 # Include routes
@@ -30,6 +52,10 @@ app.include_router(routes.router, prefix="/api")
 # Initialize WebSocket handlers
 websocket.init_socketio(sio)
 
+@app.on_event("shutdown")
+async def close_http_clients():
+    await pricing_service.close()
+
 @app.get("/")
 async def root():
     return {"message": "Joshinator API", "version": "0.1.0"}
@@ -1,6 +1,6 @@
 from typing import Optional, List, Dict, Any
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -31,20 +31,20 @@ class CardIdentification(BaseModel):
 class PricingData(BaseModel):
     """Pricing information from eBay and other sources."""
     count: int = 0
-    prices: List[float] = []
+    prices: List[float] = Field(default_factory=list)
     average: float = 0.0
     median: float = 0.0
     min_price: float = 0.0
     max_price: float = 0.0
     standard_deviation: float = 0.0
-    sale_dates: List[str] = []
-    sources: List[str] = ["eBay Sold"]
+    sale_dates: List[str] = Field(default_factory=list)
+    sources: List[str] = Field(default_factory=lambda: ["eBay Sold"])
     timeframe: str = "Last 90 days"
     query_used: Optional[str] = None
     ebay_sold_avg: Optional[float] = None
     psa_apr: Optional[float] = None
     market_price: Optional[float] = None
-    last_updated: datetime = datetime.now()
+    last_updated: datetime = Field(default_factory=datetime.now)
 
 
 class ClaudeAnalysis(BaseModel):
@@ -53,24 +53,24 @@ class ClaudeAnalysis(BaseModel):
     value_trend: Optional[str] = None
     rarity_assessment: Optional[str] = None
     investment_potential: Optional[str] = None
-    key_factors: List[str] = []
+    key_factors: List[str] = Field(default_factory=list)
     comparable_sales: Optional[str] = None
     recommendation: Optional[str] = None
     confidence: Optional[str] = None
-    analysis_timestamp: datetime = datetime.now()
+    analysis_timestamp: datetime = Field(default_factory=datetime.now)
 
 
 class DealRecommendation(BaseModel):
     """Deal recommendation from Claude."""
     recommendation: Optional[str] = None  # BUY/PASS/WATCH
     confidence: Optional[str] = None
-    fair_value_range: Dict[str, float] = {"min": 0, "max": 0}
+    fair_value_range: Dict[str, float] = Field(default_factory=lambda: {"min": 0, "max": 0})
     deal_quality: Optional[str] = None
     max_bid_suggestion: Optional[float] = None
     reasoning: Optional[str] = None
-    risk_factors: List[str] = []
+    risk_factors: List[str] = Field(default_factory=list)
     upside_potential: Optional[str] = None
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = Field(default_factory=datetime.now)
 
 
 class Card(BaseModel):
@@ -81,7 +81,7 @@ class Card(BaseModel):
     deal_recommendation: Optional[DealRecommendation] = None
     image_path: Optional[str] = None
     ocr_raw_text: Optional[str] = None
-    processing_timestamp: datetime = datetime.now()
+    processing_timestamp: datetime = Field(default_factory=datetime.now)
 
     @property
     def roi_potential(self) -> Optional[float]:
@@ -114,8 +114,8 @@ class AnalysisResult(BaseModel):
     """Result of a complete card analysis."""
     card: Card
     processing_time: float
-    errors: List[str] = []
-    warnings: List[str] = []
+    errors: List[str] = Field(default_factory=list)
+    warnings: List[str] = Field(default_factory=list)
 
     @property
     def has_errors(self) -> bool:
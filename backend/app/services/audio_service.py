@@ -1,36 +1,105 @@
 """
 Audio capture and transcription service.
 
-Captures system audio in 7-second chunks, transcribes via Whisper (base model),
+Captures system audio in 7-second chunks, transcribes via Whisper (base model —
+faster-whisper int8 when installed, openai-whisper otherwise),
 and extracts sports card attributes from the auctioneer's commentary.
 
+With AUDIO_STREAMING enabled, audio instead feeds a rolling buffer that is
+re-transcribed every second; words are confirmed once two consecutive passes
+agree on them (LocalAgreement-2), so words on a chunk boundary aren't split.
+
 macOS setup: brew install portaudio && pip install pyaudio sounddevice
 """
 import logging
+import os
 import queue
 import re
 import threading
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.pattern_scan import PatternScanner
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
 
 logger = logging.getLogger(__name__)
 
+# Chunks with less than this share of voiced 20 ms frames are skipped (webrtcvad)
+VAD_FRAME_MS = 20
+VAD_MIN_VOICED_RATIO = 0.15
+VAD_AGGRESSIVENESS = 2
+
 # Card set keywords used for extraction
 _SET_KEYWORDS: List[str] = [
     'topps', 'panini', 'bowman', 'prizm', 'select', 'optic',
     'donruss', 'upper deck', 'fleer', 'mosaic', 'chronicles',
 ]
 
+# Transcript patterns, compiled once
+_GRADE_RE = re.compile(r'\b(psa|bgs|sgc)\s*(\d+(?:\.\d+)?)\b')
+_YEAR_RE = re.compile(r'\b(19[5-9]\d|20[0-2]\d)\b')
+_SPOKEN_BID_RE = re.compile(r'\$?\b(\d{1,4}(?:\.\d{2})?)\b')
+_YEAR_LIKE_RE = re.compile(r'^(19|20)\d{2}$')
+
+# Optional single-pass scan: Hyperscan finds every attribute pattern (and each set
+# keyword, by id) in one pass over the transcript; only patterns that hit are
+# re-run through `re` for their groups. Without hyperscan every pattern runs.
+# The transcript is already lowercased, so no pattern needs to be caseless.
+_SCANNER = PatternScanner("transcript", [
+    ("grade", _GRADE_RE.pattern, False),
+    ("year", _YEAR_RE.pattern, False),
+    ("bid", _SPOKEN_BID_RE.pattern, False),
+    ("rookie", r"rookie| rc ", False),
+] + [(f"set:{kw}", re.escape(kw), False) for kw in _SET_KEYWORDS])
+
+
+def _norm_word(word: str) -> str:
+    return word.strip().strip('.,!?;:"').lower()
+
 
 class AudioService:
     CHUNK_DURATION_SECONDS = 7
     SAMPLE_RATE = 16000  # Whisper expects 16 kHz
     CHANNELS = 1
+    # Backlogged chunks transcribed together when processing falls behind capture
+    MAX_BATCH_CHUNKS = 4
+    # Streaming mode: re-transcribe a rolling window every step, trimming it at
+    # confirmed words once it exceeds the trim length
+    STREAM_STEP_SECONDS = 1.0
+    STREAM_TRIM_SECONDS = 15
+    STREAM_MAX_SECONDS = 30
 
     def __init__(self):
         self.whisper_model = None
+        self._whisper_attempted = False
+        self._backend: Optional[str] = None
+        self._batched_model = None
+        # Capture writes into a fixed pool of preallocated buffers; the queues carry
+        # buffer indices, and the processor hands each index back once transcribed
         self._audio_queue: queue.Queue = queue.Queue(maxsize=4)
+        self._buffers: List = []
+        self._free_buffers: queue.Queue = queue.Queue()
+        self._vad = webrtcvad.Vad(VAD_AGGRESSIVENESS) if webrtcvad is not None else None
+
+        # Streaming mode: rolling float32 buffer (allocated on first use) plus the
+        # LocalAgreement state. Times are seconds since the stream started.
+        self._stream_lock = threading.Lock()
+        self._stream_buf = None
+        self._stream_len = 0            # valid samples in _stream_buf
+        self._stream_new = 0            # samples appended since the last pass
+        self._stream_offset = 0.0       # stream time of _stream_buf[0]
+        self._hypothesis: List[Tuple[float, float, str]] = []  # last pass, unconfirmed
+        self._confirmed: List[Tuple[float, str]] = []          # (end, word), recent only
+        self._confirmed_until = 0.0
         self._is_running = False
-        self._capture_thread: Optional[threading.Thread] = None
+        self._input_stream = None
+        self._fill_idx: Optional[int] = None  # pool buffer the callback is filling
+        self._fill_pos = 0
         self._process_thread: Optional[threading.Thread] = None
 
         # Latest results — read by the websocket pipeline
@@ -38,21 +107,98 @@ class AudioService:
         self.latest_attributes: Dict = {}
         self.audio_confidence: float = 0.0
 
-        self._load_whisper()
-
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
 
     def _load_whisper(self) -> None:
+        # Loaded on first use rather than at import: model weights are large
+        self._whisper_attempted = True
+        # Prefer faster-whisper (CTranslate2, int8 on CPU); openai-whisper as fallback
+        try:
+            from faster_whisper import WhisperModel
+            self.whisper_model = WhisperModel(
+                "base.en", device="cpu", compute_type="int8",
+                cpu_threads=max(1, (os.cpu_count() or 2) // 2),
+            )
+            self._backend = "faster-whisper"
+            logger.info("Whisper model loaded (faster-whisper base.en, int8)")
+            try:
+                from faster_whisper import BatchedInferencePipeline
+                self._batched_model = BatchedInferencePipeline(model=self.whisper_model)
+            except ImportError:
+                pass  # faster-whisper < 1.1: backlog is transcribed in one sequential pass
+            self._warm_up()
+            return
+        except Exception as e:
+            logger.info("faster-whisper unavailable, trying openai-whisper: %s", e)
         try:
             import whisper
             self.whisper_model = whisper.load_model("base")
+            self._backend = "openai-whisper"
             logger.info("Whisper model loaded (base)")
         except Exception as e:
             logger.warning("openai-whisper not available — audio features disabled: %s", e)
+            return
+        self._warm_up()
+
+    def _warm_up(self) -> None:
+        # The first inference pays one-off kernel/mel-filter setup; absorb it on a
+        # silent clip so the first real auction chunk isn't 2-3x slower
+        if not settings.WHISPER_WARMUP:
+            return
+        try:
+            import numpy as np
+            silence = np.zeros(self.SAMPLE_RATE * 2, dtype=np.float32)
+            if self._backend == "faster-whisper":
+                # No VAD here: it would strip the silence and skip the encoder entirely.
+                # segments is lazy — consume it to actually run inference
+                segments, _info = self.whisper_model.transcribe(silence, language="en", beam_size=1)
+                list(segments)
+            else:
+                self.whisper_model.transcribe(silence, language="en", fp16=False)
+        except Exception as e:
+            logger.debug("Whisper warm-up failed: %s", e)
+
+    def _transcribe(self, audio, batched: bool = False) -> List[Tuple[float, str]]:
+        """(start_seconds, text) segments for a mono float32 16 kHz buffer.
+
+        With `batched`, faster-whisper's BatchedInferencePipeline splits the buffer
+        on VAD boundaries and runs the segments through the encoder together.
+        """
+        if self._backend == "faster-whisper":
+            if batched and self._batched_model is not None:
+                segments, _info = self._batched_model.transcribe(
+                    audio, language="en", batch_size=self.MAX_BATCH_CHUNKS * 2,
+                )
+            else:
+                segments, _info = self.whisper_model.transcribe(
+                    audio, language="en", beam_size=1, vad_filter=True,
+                    condition_on_previous_text=False,
+                )
+            return [(seg.start, seg.text) for seg in segments]
+        result = self.whisper_model.transcribe(audio, language="en", fp16=False)
+        return [(seg["start"], seg["text"]) for seg in result.get("segments", [])]
+
+    def _transcribe_words(self, audio) -> List[Tuple[float, float, str]]:
+        """(start_seconds, end_seconds, word) for every word in the buffer."""
+        if self._backend == "faster-whisper":
+            segments, _info = self.whisper_model.transcribe(
+                audio, language="en", beam_size=1, vad_filter=True,
+                condition_on_previous_text=False, word_timestamps=True,
+            )
+            return [(w.start, w.end, w.word) for seg in segments for w in (seg.words or [])]
+        result = self.whisper_model.transcribe(
+            audio, language="en", fp16=False, word_timestamps=True,
+        )
+        return [
+            (w["start"], w["end"], w["word"])
+            for seg in result.get("segments", []) for w in seg.get("words", [])
+        ]
 
     def is_available(self) -> bool:
+        if not self._whisper_attempted:
+            self._load_whisper()
         return self.whisper_model is not None
 
     def start(self) -> None:
@@ -61,53 +207,108 @@ class AudioService:
             return
         if self._is_running:
             return
+        try:
+            import sounddevice as sd
+            import numpy as np
+        except ImportError:
+            logger.error("sounddevice not installed — audio capture disabled")
+            return
+
+        if settings.AUDIO_STREAMING:
+            self._reset_stream()
+            if self._stream_buf is None:
+                self._stream_buf = np.zeros(int(self.STREAM_MAX_SECONDS * self.SAMPLE_RATE), dtype=np.float32)
+            callback, dtype, process_loop = self._on_stream_audio, "float32", self._stream_process_loop
+        else:
+            self._init_chunk_pool(np)
+            callback, dtype, process_loop = self._on_chunk_audio, "int16", self._process_loop
+
+        # Capture runs on PortAudio's own callback thread; only transcription needs one of ours
+        try:
+            self._input_stream = sd.InputStream(
+                samplerate=self.SAMPLE_RATE,
+                channels=self.CHANNELS,
+                dtype=dtype,
+                blocksize=self.SAMPLE_RATE // 10,
+                callback=callback,
+            )
+            self._input_stream.start()
+        except Exception as e:
+            logger.error("Audio capture error: %s", e)
+            self._input_stream = None
+            return
+
         self._is_running = True
-        self._capture_thread = threading.Thread(
-            target=self._capture_loop, daemon=True, name="audio-capture"
-        )
         self._process_thread = threading.Thread(
-            target=self._process_loop, daemon=True, name="audio-process"
+            target=process_loop, daemon=True, name="audio-process"
         )
-        self._capture_thread.start()
         self._process_thread.start()
         logger.info("AudioService started")
 
     def stop(self) -> None:
         self._is_running = False
+        stream, self._input_stream = self._input_stream, None
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception as e:
+                logger.debug("Closing audio input stream failed: %s", e)
         logger.info("AudioService stopped")
 
     # ------------------------------------------------------------------
-    # Audio capture thread
+    # Audio capture (PortAudio callback thread)
     # ------------------------------------------------------------------
 
-    def _capture_loop(self) -> None:
-        """Continuously capture CHUNK_DURATION_SECONDS of audio and enqueue it."""
-        try:
-            import sounddevice as sd
-            import numpy as np
-
-            while self._is_running:
+    def _init_chunk_pool(self, np) -> None:
+        if not self._buffers:
+            # queued + one batch in transcription + one being filled
+            pool_size = self._audio_queue.maxsize + self.MAX_BATCH_CHUNKS + 1
+            samples = int(self.CHUNK_DURATION_SECONDS * self.SAMPLE_RATE)
+            # int16 PCM: half the bytes of float32; the worker converts once
+            self._buffers = [
+                np.empty((samples, self.CHANNELS), dtype=np.int16) for _ in range(pool_size)
+            ]
+            for idx in range(pool_size):
+                self._free_buffers.put(idx)
+        if self._fill_idx is not None:
+            # Partial chunk left over from the previous run
+            self._free_buffers.put(self._fill_idx)
+            self._fill_idx = None
+
+    def _on_chunk_audio(self, indata, _frames, _time_info, status) -> None:
+        """Copy each block into the current pool buffer; enqueue it once CHUNK_DURATION_SECONDS is full."""
+        if status:
+            logger.debug("Audio input status: %s", status)
+        pos = 0
+        while pos < len(indata):
+            if self._fill_idx is None:
                 try:
-                    chunk = sd.rec(
-                        int(self.CHUNK_DURATION_SECONDS * self.SAMPLE_RATE),
-                        samplerate=self.SAMPLE_RATE,
-                        channels=self.CHANNELS,
-                        dtype="float32",
-                    )
-                    sd.wait()
-                    # Non-blocking put; drop if queue is full (processing can't keep up)
-                    try:
-                        self._audio_queue.put_nowait(chunk)
-                    except queue.Full:
-                        pass
-                except Exception as e:
-                    logger.error("Audio capture error: %s", e)
-                    if self._is_running:
-                        import time; time.sleep(1)
-
-        except ImportError:
-            logger.error("sounddevice not installed — audio capture disabled")
-            self._is_running = False
+                    self._fill_idx = self._free_buffers.get_nowait()
+                except queue.Empty:
+                    return  # whole pool queued or transcribing; drop this block
+                self._fill_pos = 0
+            buf = self._buffers[self._fill_idx]
+            n = min(len(indata) - pos, len(buf) - self._fill_pos)
+            buf[self._fill_pos:self._fill_pos + n] = indata[pos:pos + n]
+            self._fill_pos += n
+            pos += n
+            if self._fill_pos == len(buf):
+                self._enqueue_chunk(self._fill_idx)
+                self._fill_idx = None
+
+    def _enqueue_chunk(self, idx: int) -> None:
+        # Processing can't keep up: evict the oldest pending chunk, not
+        # this one — the auction only cares about what's being said now
+        while True:
+            try:
+                self._audio_queue.put_nowait(idx)
+                return
+            except queue.Full:
+                try:
+                    self._free_buffers.put(self._audio_queue.get_nowait())
+                except queue.Empty:
+                    pass
 
     # ------------------------------------------------------------------
     # Transcription thread
@@ -115,27 +316,169 @@ class AudioService:
 
     def _process_loop(self) -> None:
         """Pull audio chunks, transcribe with Whisper, extract card attributes."""
+        import numpy as np
+
+        # float32 scratch for one full batch; chunks are scaled from int16 into it
+        samples = int(self.CHUNK_DURATION_SECONDS * self.SAMPLE_RATE) * self.CHANNELS
+        scratch = np.empty(samples * self.MAX_BATCH_CHUNKS, dtype=np.float32)
+
         while self._is_running:
             try:
-                chunk = self._audio_queue.get(timeout=2)
-                audio_flat = chunk.flatten()
-                result = self.whisper_model.transcribe(
-                    audio_flat, language="en", fp16=False
-                )
-                transcript: str = result.get("text", "").strip()
+                indices = [self._audio_queue.get(timeout=2)]
+                # Fell behind: take the whole backlog in one transcription
+                while len(indices) < self.MAX_BATCH_CHUNKS:
+                    try:
+                        indices.append(self._audio_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    # Silent / crowd-noise chunks never reach Whisper
+                    voiced = [idx for idx in indices if self._has_speech(self._buffers[idx])]
+                    # Scale int16 → float32 straight into the scratch buffer (this also
+                    # lays batched chunks end to end, so no concatenate)
+                    for n, idx in enumerate(voiced):
+                        np.multiply(
+                            self._buffers[idx].reshape(-1), 1.0 / 32768.0,
+                            out=scratch[n * samples:(n + 1) * samples],
+                        )
+                finally:
+                    for idx in indices:
+                        self._free_buffers.put(idx)
+                if not voiced:
+                    continue
+                audio = scratch[:len(voiced) * samples]
+                segments = self._transcribe(audio, batched=len(voiced) > 1)
+
+                # Attributes describe what's on air now: prefer the newest chunk's speech
+                newest_start = (len(voiced) - 1) * self.CHUNK_DURATION_SECONDS
+                recent = [text for start, text in segments if start >= newest_start]
+                transcript = "".join(recent or [text for _, text in segments]).strip()
                 if transcript:
-                    self.latest_transcript = transcript
-                    self.latest_attributes = self._extract_attributes(transcript)
-                    self.audio_confidence = self._score_confidence(self.latest_attributes)
-                    logger.debug(
-                        "Audio transcript: %s | confidence: %.2f",
-                        transcript[:80], self.audio_confidence
-                    )
+                    self._publish_transcript(transcript)
             except queue.Empty:
                 continue
             except Exception as e:
                 logger.error("Audio processing error: %s", e)
 
+    def _has_speech(self, pcm16) -> bool:
+        """WebRTC VAD over 20 ms frames of an int16 mono chunk; True without webrtcvad."""
+        if self._vad is None:
+            return True
+        frame_bytes = self.SAMPLE_RATE * VAD_FRAME_MS // 1000 * 2
+        data = memoryview(pcm16.reshape(-1)).cast("B")
+        frames = len(data) // frame_bytes
+        if not frames:
+            return True
+        voiced = sum(
+            self._vad.is_speech(data[i * frame_bytes:(i + 1) * frame_bytes], self.SAMPLE_RATE)
+            for i in range(frames)
+        )
+        return voiced / frames >= VAD_MIN_VOICED_RATIO
+
+    def _publish_transcript(self, transcript: str) -> None:
+        self.latest_transcript = transcript
+        self.latest_attributes = self._extract_attributes(transcript)
+        self.audio_confidence = self._score_confidence(self.latest_attributes)
+        logger.debug(
+            "Audio transcript: %s | confidence: %.2f",
+            transcript[:80], self.audio_confidence
+        )
+
+    # ------------------------------------------------------------------
+    # Streaming mode (AUDIO_STREAMING)
+    # ------------------------------------------------------------------
+
+    def _reset_stream(self) -> None:
+        with self._stream_lock:
+            self._stream_len = 0
+            self._stream_new = 0
+            self._stream_offset = 0.0
+        self._hypothesis = []
+        self._confirmed = []
+        self._confirmed_until = 0.0
+
+    def _on_stream_audio(self, indata, _frames, _time_info, status) -> None:
+        if status:
+            logger.debug("Audio input status: %s", status)
+        self._stream_append(indata[:, 0])
+
+    def _stream_append(self, samples) -> None:
+        with self._stream_lock:
+            buf = self._stream_buf
+            n = min(len(samples), len(buf))
+            overflow = self._stream_len + n - len(buf)
+            if overflow > 0:
+                # Buffer full (no confirmed word to trim at): drop the oldest audio
+                buf[:self._stream_len - overflow] = buf[overflow:self._stream_len]
+                self._stream_len -= overflow
+                self._stream_offset += overflow / self.SAMPLE_RATE
+            buf[self._stream_len:self._stream_len + n] = samples[-n:]
+            self._stream_len += n
+            self._stream_new += n
+
+    def _stream_trim(self, until_seconds: float) -> None:
+        """Drop buffered audio before `until_seconds` (stream time)."""
+        with self._stream_lock:
+            cut = int((until_seconds - self._stream_offset) * self.SAMPLE_RATE)
+            cut = max(0, min(cut, self._stream_len))
+            if cut:
+                buf = self._stream_buf
+                buf[:self._stream_len - cut] = buf[cut:self._stream_len]
+                self._stream_len -= cut
+                self._stream_offset += cut / self.SAMPLE_RATE
+
+    def _stream_process_loop(self) -> None:
+        """Re-transcribe the rolling buffer every STREAM_STEP_SECONDS and confirm agreed words."""
+        step = int(self.STREAM_STEP_SECONDS * self.SAMPLE_RATE)
+        while self._is_running:
+            with self._stream_lock:
+                ready = self._stream_buf is not None and self._stream_new >= step
+                if ready:
+                    audio = self._stream_buf[:self._stream_len].copy()
+                    offset = self._stream_offset
+                    self._stream_new = 0
+            if not ready:
+                time.sleep(0.1)
+                continue
+            try:
+                words = [
+                    (offset + start, offset + end, text)
+                    for start, end, text in self._transcribe_words(audio)
+                ]
+                self._commit_agreed(words)
+                # Keep the window short: once past the trim length, cut at the last confirmed word
+                if len(audio) > self.STREAM_TRIM_SECONDS * self.SAMPLE_RATE and self._confirmed_until > offset:
+                    self._stream_trim(self._confirmed_until)
+            except Exception as e:
+                logger.error("Audio processing error: %s", e)
+
+    def _commit_agreed(self, words: List[Tuple[float, float, str]]) -> None:
+        """LocalAgreement-2: confirm the longest prefix on which this pass and the last agree."""
+        fresh = [w for w in words if w[0] >= self._confirmed_until - 0.1]
+        # The word straddling the confirmed boundary can reappear; drop a repeated tail n-gram
+        tail = [_norm_word(text) for _, text in self._confirmed[-5:]]
+        for n in range(min(len(tail), len(fresh)), 0, -1):
+            if tail[-n:] == [_norm_word(w[2]) for w in fresh[:n]]:
+                fresh = fresh[n:]
+                break
+
+        agreed = []
+        for new, old in zip(fresh, self._hypothesis):
+            if _norm_word(new[2]) != _norm_word(old[2]):
+                break
+            agreed.append(new)
+        self._hypothesis = fresh[len(agreed):]
+        if not agreed:
+            return
+
+        self._confirmed_until = agreed[-1][1]
+        horizon = self._confirmed_until - self.CHUNK_DURATION_SECONDS
+        self._confirmed = [
+            (end, text) for end, text in self._confirmed + [(end, text) for _, end, text in agreed]
+            if end >= horizon
+        ]
+        self._publish_transcript("".join(text for _, text in self._confirmed).strip())
+
     # ------------------------------------------------------------------
     # Attribute extraction
     # ------------------------------------------------------------------
@@ -144,11 +487,10 @@ class AudioService:
         """Extract structured card attributes from a Whisper transcript."""
         attrs: Dict = {}
         lower = text.lower()
+        hits = _SCANNER.hits(lower)
 
         # Grade — PSA / BGS / SGC + numeric
-        grade_match = re.search(
-            r'\b(psa|bgs|sgc)\s*(\d+(?:\.\d+)?)\b', lower
-        )
+        grade_match = _GRADE_RE.search(lower) if hits is None or "grade" in hits else None
         if grade_match:
             company = grade_match.group(1).upper()
             value = grade_match.group(2)
@@ -156,27 +498,27 @@ class AudioService:
             attrs["grading_company"] = company
 
         # Year
-        year_match = re.search(r'\b(19[5-9]\d|20[0-2]\d)\b', text)
+        year_match = _YEAR_RE.search(text) if hits is None or "year" in hits else None
         if year_match:
             attrs["year"] = year_match.group(1)
 
         # Set name
         for kw in _SET_KEYWORDS:
-            if kw in lower:
+            if (kw in lower) if hits is None else (f"set:{kw}" in hits):
                 attrs["set_name"] = kw.title()
                 break
 
         # Rookie flag
-        if any(w in lower for w in ("rookie", "rookie card", " rc ")):
+        if ("rookie" in hits) if hits is not None else any(w in lower for w in ("rookie", " rc ")):
             attrs["rookie"] = True
 
         # Spoken bid — auctioneer reads the price aloud ("forty dollars", "$40", "40 bucks")
         # Match plain numbers that could be prices (1–4 digits, optionally decimal)
-        bid_match = re.search(r'\$?\b(\d{1,4}(?:\.\d{2})?)\b', text)
+        bid_match = _SPOKEN_BID_RE.search(text) if hits is None or "bid" in hits else None
         if bid_match:
             candidate = float(bid_match.group(1))
             # Filter out years and card numbers (if value looks like a year it's probably not a bid)
-            if not re.match(r'^(19|20)\d{2}$', bid_match.group(1)):
+            if not _YEAR_LIKE_RE.match(bid_match.group(1)):
                 attrs["spoken_bid"] = candidate
 
         return attrs
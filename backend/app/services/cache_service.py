@@ -1,26 +1,73 @@
+import atexit
 import sqlite3
-import json
 import hashlib
 import threading
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
+
+import orjson
 
 from app.config import settings
 
+_KEY_FIELDS = ("player_name", "year", "set_name", "grade", "card_number")
+
+# Writes are buffered and flushed as one transaction by the background flusher,
+# every FLUSH_INTERVAL_SECS or as soon as this many are pending
+FLUSH_MAX_ROWS = 32
+FLUSH_INTERVAL_SECS = 0.25
+# Expired rows are purged opportunistically once every this many flushes, and the
+# table is trimmed (oldest first) back to MAX_ROWS at the same time
+PURGE_EVERY_N_FLUSHES = 40
+MAX_ROWS = 10000
+
 
 class SQLiteCacheService:
     def __init__(self, db_path: str = None, ttl_hours: int = None):
         self.db_path = db_path or settings.PRICING_CACHE_DB
         self.ttl = timedelta(hours=ttl_hours or settings.PRICING_CACHE_TTL_HOURS)
-        self._lock = threading.Lock()
+        self._lock = threading.Lock()  # serialises writers; WAL readers don't need it
+        self._tls = threading.local()
+        self._conns = []
+        # Unflushed rows by cache key; _flushing holds the batch being written so
+        # reads still see it until it is committed
+        self._pending: Dict[str, Tuple[str, str, str, str]] = {}
+        self._flushing: Dict[str, Tuple[str, str, str, str]] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_count = 0
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()  # set by writers when a full batch is pending
         self._init_db()
+        atexit.register(self.close)
 
     def _get_conn(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
+        """One persistent autocommit connection per thread."""
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._tls.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+        with self._lock:
+            if self._conns:
+                self._conns[0].execute("PRAGMA optimize")  # refresh planner stats for the index
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+        self._tls = threading.local()
 
     def _init_db(self):
+        conn = self._get_conn()
         with self._lock:
-            conn = self._get_conn()
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS pricing_cache (
                     cache_key TEXT PRIMARY KEY,
@@ -29,48 +76,105 @@ class SQLiteCacheService:
                     created_at TEXT NOT NULL
                 )
             """)
-            conn.commit()
-            conn.close()
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_created_at ON pricing_cache(created_at)"
+            )
 
     def _make_key(self, card_info: Dict) -> str:
-        """Stable MD5 hash of the fields relevant to pricing."""
-        relevant = {k: card_info.get(k, "") for k in
-                    ["player_name", "year", "set_name", "grade", "card_number"]}
-        return hashlib.md5(json.dumps(relevant, sort_keys=True).encode()).hexdigest()
+        """Stable BLAKE2b hash of the fields relevant to pricing, unit-separator joined."""
+        parts = [str(card_info.get(k) or "").encode("utf-8", "ignore") for k in _KEY_FIELDS]
+        return hashlib.blake2b(b"\x1f".join(parts), digest_size=16).hexdigest()
 
     def get(self, card_info: Dict) -> Optional[Dict]:
-        key = self._make_key(card_info)
-        with self._lock:
-            conn = self._get_conn()
-            row = conn.execute(
+        return self.get_by_key(self._make_key(card_info))
+
+    def get_by_key(self, key: str) -> Optional[Dict]:
+        """`get` for a key the caller already computed with `_make_key`."""
+        with self._pending_lock:
+            row = self._pending.get(key) or self._flushing.get(key)
+        if row:
+            row = row[1], row[3]
+        else:
+            row = self._get_conn().execute(
                 "SELECT data, created_at FROM pricing_cache WHERE cache_key = ?", (key,)
             ).fetchone()
-            conn.close()
         if not row:
             return None
         created = datetime.fromisoformat(row[1])
         if datetime.now() - created > self.ttl:
             return None
-        return json.loads(row[0])
+        return orjson.loads(row[0])
 
     def set(self, card_info: Dict, data: Dict, query: str = ""):
-        key = self._make_key(card_info)
+        self.set_by_key(self._make_key(card_info), data, query)
+
+    def set_by_key(self, key: str, data: Dict, query: str = ""):
+        """`set` for a key the caller already computed with `_make_key`."""
+        row = (key, orjson.dumps(data).decode(), query, datetime.now().isoformat())
+        with self._pending_lock:
+            self._pending[key] = row
+            full = len(self._pending) >= FLUSH_MAX_ROWS
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, daemon=True, name="pricing-cache-flush"
+                )
+                self._flusher.start()
+        if full:
+            # Callers are on the event loop: leave the commit to the flusher thread
+            self._wake.set()
+
+    def flush(self):
+        """Write all pending rows in one transaction (plus a periodic purge)."""
+        conn = self._get_conn()
         with self._lock:
-            conn = self._get_conn()
-            conn.execute(
-                "INSERT OR REPLACE INTO pricing_cache VALUES (?, ?, ?, ?)",
-                (key, json.dumps(data), query, datetime.now().isoformat())
-            )
-            conn.commit()
-            conn.close()
+            with self._pending_lock:
+                if not self._pending:
+                    return
+                self._flushing, self._pending = self._pending, {}
+            self._flush_count += 1
+            try:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO pricing_cache VALUES (?, ?, ?, ?)",
+                    list(self._flushing.values())
+                )
+                if self._flush_count % PURGE_EVERY_N_FLUSHES == 0:
+                    self._purge(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                with self._pending_lock:
+                    self._flushing = {}
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(FLUSH_INTERVAL_SECS)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # rows are dropped; a cache miss just re-fetches the price
 
     def purge_expired(self):
-        cutoff = (datetime.now() - self.ttl).isoformat()
+        conn = self._get_conn()
         with self._lock:
-            conn = self._get_conn()
-            conn.execute("DELETE FROM pricing_cache WHERE created_at < ?", (cutoff,))
-            conn.commit()
-            conn.close()
+            self._purge(conn)
 
+    def _purge(self, conn: sqlite3.Connection):
+        """Delete expired rows and cap the table at MAX_ROWS; both walk idx_created_at."""
+        cutoff = (datetime.now() - self.ttl).isoformat()
+        conn.execute("DELETE FROM pricing_cache WHERE created_at < ?", (cutoff,))
+        conn.execute(
+            """
+            DELETE FROM pricing_cache WHERE created_at <= (
+                SELECT created_at FROM pricing_cache
+                ORDER BY created_at DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (MAX_ROWS,),
+        )
 
 cache_service = SQLiteCacheService()
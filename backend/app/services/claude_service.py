@@ -1,12 +1,67 @@
-import asyncio
-import json
-from typing import Dict, List, Optional, Any
-from anthropic import Anthropic
+from typing import AsyncIterator, Dict, List, Optional, Any
+import httpx
+import orjson
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 from ..config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _pretty_json(obj: Any) -> str:
+    """Indented JSON for embedding data in prompts.
+
+    NumPy arrays and scalars (pricing and ROI figures) serialize as plain numbers.
+    """
+    return orjson.dumps(
+        obj,
+        default=float,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    ).decode()
+
+
+class _JSONObjectScanner:
+    """Find the first top-level {...} in text that arrives in chunks.
+
+    Tracks brace depth (ignoring braces inside strings) over each new chunk
+    only, so the object is available the moment its closing brace streams in.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Append a chunk; return the complete object's text once it has closed."""
+        self.text += chunk
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = self._start != -1
+            elif ch == "{":
+                if self._start == -1:
+                    self._start = i
+                self._depth += 1
+            elif ch == "}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos = i + 1
+                    return text[self._start:i + 1]
+        self._pos = len(text)
+        return None
+
+
 class ClaudeService:
     """Service for interacting with Claude AI for card analysis and insights."""
     
@@ -15,7 +70,16 @@ class ClaudeService:
             logger.warning("Anthropic API key not configured - Claude features will be disabled")
             self.client = None
         else:
-            self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+            # Async client: concurrent analyses share one connection pool on the
+            # event loop instead of each holding an executor thread for the round-trip
+            self.client = AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                max_retries=2,
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+                ),
+            )
     
     def is_available(self) -> bool:
         """Check if Claude service is available."""
@@ -38,17 +102,7 @@ class ClaudeService:
             # Prepare the prompt for Claude
             prompt = self._build_card_analysis_prompt(card_data)
             
-            # Run the API call in a thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, 
-                self._call_claude_api,
-                prompt
-            )
-            
-            # Parse the response
-            analysis = self._parse_analysis_response(response)
-            return analysis
+            return await self._stream_json_object(prompt)
             
         except Exception as e:
             logger.error(f"Error analyzing card with Claude: {str(e)}")
@@ -71,20 +125,39 @@ class ClaudeService:
         try:
             prompt = self._build_deal_recommendation_prompt(card_data, current_bid)
             
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                self._call_claude_api,
-                prompt
-            )
-            
-            recommendation = self._parse_recommendation_response(response)
-            return recommendation
+            return await self._stream_json_object(prompt)
             
         except Exception as e:
             logger.error(f"Error generating deal recommendation: {str(e)}")
             return {"error": f"Recommendation failed: {str(e)}"}
     
+    async def generate_deal_recommendation_stream(
+        self, card_data: Dict[str, Any], current_bid: float
+    ) -> AsyncIterator[str]:
+        """
+        Stream the deal recommendation text as Claude generates it.
+        
+        Args:
+            card_data: Card information
+            current_bid: Current auction price
+        
+        Yields:
+            Text chunks; join them and pass to _parse_recommendation_response
+            for the same dict generate_deal_recommendation returns
+        """
+        prompt = self._build_deal_recommendation_prompt(card_data, current_bid)
+        try:
+            async with self.client.messages.stream(
+                model=settings.CLAUDE_MODEL,
+                max_tokens=settings.CLAUDE_MAX_TOKENS,
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+        except Exception as e:
+            logger.error(f"Claude streaming call failed: {str(e)}")
+            raise
+    
     async def summarize_market_trends(self, recent_sales: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze recent sales data to identify market trends.
@@ -101,24 +174,71 @@ class ClaudeService:
         try:
             prompt = self._build_market_trends_prompt(recent_sales)
             
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                self._call_claude_api,
-                prompt
-            )
-            
-            trends = self._parse_trends_response(response)
-            return trends
+            return await self._stream_json_object(prompt)
             
         except Exception as e:
             logger.error(f"Error analyzing market trends: {str(e)}")
             return {"error": f"Trends analysis failed: {str(e)}"}
     
-    def _call_claude_api(self, prompt: str) -> str:
-        """Make synchronous call to Claude API."""
+    async def analyze_card_bundle(
+        self, card_data: Dict[str, Any], current_bid: float, recent_sales: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Card analysis, deal recommendation and market trends in one Claude call.
+        
+        Args:
+            card_data: Card information
+            current_bid: Current auction price
+            recent_sales: List of recent sale data
+        
+        Returns:
+            {"analysis": ..., "recommendation": ..., "trends": ...}, each shaped like
+            the result of the corresponding single-purpose method
+        """
+        sections = ("analysis", "recommendation", "trends")
+        if not self.is_available():
+            return {name: {"error": "Claude service not available"} for name in sections}
+        
         try:
-            message = self.client.messages.create(
+            prompt = self._build_card_bundle_prompt(card_data, current_bid, recent_sales)
+            envelope = await self._stream_json_object(prompt)
+        except Exception as e:
+            logger.error(f"Error running bundled card analysis: {str(e)}")
+            return {name: {"error": f"Bundled analysis failed: {str(e)}"} for name in sections}
+        
+        if envelope.get("format") == "text":
+            return {name: dict(envelope) for name in sections}
+        return {
+            name: envelope.get(name) or {"error": f"{name} missing from bundled response"}
+            for name in sections
+        }
+    
+    async def _stream_json_object(self, prompt: str) -> Dict[str, Any]:
+        """Stream a response and parse its JSON object as soon as the object closes.
+
+        The stream is abandoned at that point, so trailing commentary is never
+        generated. Falls back to _parse_analysis_response on the full text when
+        no complete object arrives.
+        """
+        scanner = _JSONObjectScanner()
+        async with self.client.messages.stream(
+            model=settings.CLAUDE_MODEL,
+            max_tokens=settings.CLAUDE_MAX_TOKENS,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for text in stream.text_stream:
+                obj = scanner.feed(text)
+                if obj is not None:
+                    try:
+                        return orjson.loads(obj)
+                    except orjson.JSONDecodeError:
+                        break
+        return self._parse_analysis_response(scanner.text)
+
+    async def _call_claude_api(self, prompt: str) -> str:
+        """Make a call to the Claude API."""
+        try:
+            message = await self.client.messages.create(
                 model=settings.CLAUDE_MODEL,
                 max_tokens=settings.CLAUDE_MAX_TOKENS,
                 messages=[
@@ -144,7 +264,7 @@ Card Information:
 - Set: {card_data.get('set_name', 'Unknown')}
 - Grade: {card_data.get('grade', 'Unknown')}
 - Current Price: ${card_data.get('current_price', 0)}
-- Recent Sales: {json.dumps(card_data.get('recent_sales', []), indent=2)}
+- Recent Sales: {_pretty_json(card_data.get('recent_sales', []))}
 
 Please provide analysis in JSON format with these fields:
 {{
@@ -168,7 +288,7 @@ Evaluate if this current bid represents a good deal:
 Card: {card_data.get('player_name', 'Unknown')} {card_data.get('year', '')} {card_data.get('set_name', '')}
 Grade: {card_data.get('grade', 'Unknown')}
 Current Bid: ${current_bid}
-Market Data: {json.dumps(card_data.get('pricing_data', {}), indent=2)}
+Market Data: {_pretty_json(card_data.get('pricing_data', {}))}
 
 Provide recommendation in JSON format:
 {{
@@ -183,6 +303,59 @@ Provide recommendation in JSON format:
 }}
 
 Consider current market conditions, recent sales, and long-term value trends.
+"""
+    
+    def _build_card_bundle_prompt(
+        self, card_data: Dict[str, Any], current_bid: float, recent_sales: List[Dict[str, Any]]
+    ) -> str:
+        """Build one prompt covering card analysis, deal recommendation and market trends."""
+        return f"""
+Analyze this sports card, evaluate the current bid, and summarize recent market trends:
+
+Card Information:
+- Player: {card_data.get('player_name', 'Unknown')}
+- Year: {card_data.get('year', 'Unknown')}
+- Set: {card_data.get('set_name', 'Unknown')}
+- Grade: {card_data.get('grade', 'Unknown')}
+- Current Bid: ${current_bid}
+- Market Data: {_pretty_json(card_data.get('pricing_data', {}))}
+
+Recent Sales Data:
+{_pretty_json(recent_sales)}
+
+Return ONLY one JSON object with these three sections:
+{{
+    "analysis": {{
+        "market_value_estimate": "estimated fair market value",
+        "value_trend": "increasing/decreasing/stable",
+        "rarity_assessment": "common/uncommon/rare/very_rare",
+        "investment_potential": "poor/fair/good/excellent",
+        "key_factors": ["list of factors affecting value"],
+        "comparable_sales": "analysis of recent comparable sales",
+        "recommendation": "buy/hold/sell recommendation with reasoning"
+    }},
+    "recommendation": {{
+        "recommendation": "BUY/PASS/WATCH",
+        "confidence": "high/medium/low",
+        "fair_value_range": {{"min": 0, "max": 0}},
+        "deal_quality": "excellent/good/fair/poor",
+        "max_bid_suggestion": 0,
+        "reasoning": "detailed explanation of recommendation",
+        "risk_factors": ["potential risks"],
+        "upside_potential": "percentage upside if applicable"
+    }},
+    "trends": {{
+        "overall_trend": "bullish/bearish/sideways",
+        "price_momentum": "strong_up/up/flat/down/strong_down",
+        "volume_analysis": "high/normal/low trading volume",
+        "key_observations": ["important market observations"],
+        "emerging_patterns": ["patterns in the data"],
+        "recommended_actions": ["actionable recommendations"],
+        "market_outlook": "short-term outlook for this segment"
+    }}
+}}
+
+Focus on actionable insights for auction bidding decisions.
 """
     
     def _build_market_trends_prompt(self, recent_sales: List[Dict[str, Any]]) -> str:
@@ -191,7 +364,7 @@ Consider current market conditions, recent sales, and long-term value trends.
 Analyze these recent sales to identify market trends:
 
 Recent Sales Data:
-{json.dumps(recent_sales, indent=2)}
+{_pretty_json(recent_sales)}
 
 Provide trend analysis in JSON format:
 {{
@@ -216,14 +389,14 @@ Focus on patterns that would help with auction bidding strategies.
             
             if json_start != -1 and json_end > json_start:
                 json_str = response[json_start:json_end]
-                return json.loads(json_str)
+                return orjson.loads(json_str)
             else:
                 # Fallback to plain text response
                 return {
                     "analysis": response,
                     "format": "text"
                 }
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return {
                 "analysis": response,
                 "format": "text",
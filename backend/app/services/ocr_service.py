@@ -1,31 +1,216 @@
 import cv2
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import bisect
+import contextlib
+import functools
+import importlib.util
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import re
 
+from app.config import settings
+from app.utils.pattern_scan import PatternScanner
+
+# Blank rows between crops when several are stacked into one PaddleOCR pass
+_BATCH_GAP_PX = 16
+
+# Wider images are downsampled before OCR: detection is no better above this,
+# and detector cost grows with the square of the resolution
+_OCR_MAX_WIDTH = 960
+
+# Crop preprocessing runs on the OpenCL device via UMat when enabled and present
+_USE_OPENCL = settings.OCR_USE_OPENCL and cv2.ocl.haveOpenCL()
+
+# Execution providers tried for the ONNX models, best first; filtered against what
+# the installed onnxruntime build (CPU, -gpu, -openvino) actually offers
+_ORT_PROVIDER_PRIORITY = (
+    "TensorrtExecutionProvider",
+    "CUDAExecutionProvider",
+    "OpenVINOExecutionProvider",
+    "CPUExecutionProvider",
+)
+
+
+@contextlib.contextmanager
+def _ort_providers():
+    """Give ONNX Runtime sessions created inside the block an explicit provider list.
+
+    PaddleOCR builds its sessions as ``InferenceSession(path)``; GPU and OpenVINO
+    builds of onnxruntime refuse that (the list is mandatory when more than CPU
+    is available), and CPU-only builds would fall back to CPU anyway.
+    """
+    import onnxruntime as ort
+    available = ort.get_available_providers()
+    providers = [p for p in _ORT_PROVIDER_PRIORITY if p in available] or available
+    session_cls = ort.InferenceSession
+    ort.InferenceSession = functools.partial(session_cls, providers=providers)
+    try:
+        yield providers
+    finally:
+        ort.InferenceSession = session_cls
+
+
+def _torch_cuda_available() -> bool:
+    if importlib.util.find_spec("torch") is None:
+        return False
+    import torch
+    return torch.cuda.is_available()
+
+
+_CARD_SET_KEYWORDS = ['topps', 'panini', 'bowman', 'upper deck', 'donruss']
+
+# Card-info patterns, compiled once
+_YEAR_RE = re.compile(r'\b(19[5-9]\d|20[0-2]\d)\b')
+_GRADE_RE = re.compile(r'\b(PSA|BGS|SGC)\s*(\d+(?:\.\d+)?)\b', re.IGNORECASE)
+_CARD_NUM_RE = re.compile(r'#(\d+)')
+_LEADING_DIGIT_RE = re.compile(r'\d')
+_NAME_EXCLUDE = frozenset({'PSA', 'BGS', 'SGC', 'TOPPS', 'PANINI', 'BOWMAN'})
+
+# Optional single-pass scan for _extract_card_info: Hyperscan reports which field
+# patterns (and which set keyword) occur, and only those are re-run through `re`
+# for their groups. Without hyperscan every pattern runs.
+_CARD_SCANNER = PatternScanner("card-info", [
+    ("year", _YEAR_RE.pattern, False),
+    ("grade", _GRADE_RE.pattern, True),
+    ("card_number", _CARD_NUM_RE.pattern, True),
+    ("rookie", r'rookie|rc', True),
+] + [(f"set:{kw}", re.escape(kw), True) for kw in _CARD_SET_KEYWORDS])
+
+
+# Returned (copied) by OCRService._mock_ocr_result, which may run every frame
+_MOCK_OCR_RESULT: Dict = {
+    "texts": (
+        {"text": "2023", "confidence": 0.95, "bbox": [[100, 50], [150, 50], [150, 70], [100, 70]]},
+        {"text": "Topps", "confidence": 0.90, "bbox": [[100, 80], [160, 80], [160, 100], [100, 100]]},
+        {"text": "Mike Trout", "confidence": 0.88, "bbox": [[100, 110], [200, 110], [200, 130], [100, 130]]},
+        {"text": "PSA 10", "confidence": 0.92, "bbox": [[100, 140], [160, 140], [160, 160], [100, 160]]},
+        {"text": "#27", "confidence": 0.85, "bbox": [[100, 170], [140, 170], [140, 190], [100, 190]]},
+    ),
+    "confidence": 0.90,
+    "card_info": {
+        "player_name": "Mike Trout",
+        "year": "2023",
+        "set_name": "Topps",
+        "card_number": "27",
+        "grade": "PSA 10",
+        "rookie": False,
+    },
+    "text": "2023 Topps Mike Trout PSA 10 #27",
+    "ocr_engine": "mock",
+}
+
+
+def _as_gray(image: np.ndarray) -> np.ndarray:
+    """Single-channel copy of a preprocessed crop; its error fallback returns the input as is."""
+    if image.ndim == 2:
+        return image
+    code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(image, code)
+
 
 class OCRService:
     def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=2)
-        self.ocr_engine = "mock"
+        self.executor = ThreadPoolExecutor(max_workers=settings.OCR_CONCURRENCY)
+        # Bounds OCR calls in flight across every caller (frames, batches, regions)
+        self._sem = asyncio.Semaphore(settings.OCR_CONCURRENCY)
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._ocr_engine: Optional[str] = None
+        self._engine_lock = threading.Lock()
         self.paddle_reader = None
         self.easy_reader = None
-
-        try:
-            from paddleocr import PaddleOCR
-            self.paddle_reader = PaddleOCR(use_angle_cls=True, lang='en', show_log=False)
-            self.ocr_engine = "paddleocr"
-            print("✅ PaddleOCR loaded successfully")
-        except Exception:
+        # Readers are shared by every OCR thread, and Paddle Inference predictors
+        # (EasyOCR's torch models too, under cudnn autotuning) aren't thread-safe:
+        # one inference per engine at a time. Threads still overlap preprocessing.
+        self._paddle_lock = threading.Lock()
+        self._easy_lock = threading.Lock()
+
+    @property
+    def ocr_engine(self) -> str:
+        """Name of the active engine; the engine itself is loaded on first use."""
+        if self._ocr_engine is None:
+            self._load_engine()
+        return self._ocr_engine
+
+    def _load_engine(self) -> None:
+        # Deferred from __init__ so importing this module (every server worker does)
+        # doesn't pull in PaddlePaddle / PyTorch and the model weights.
+        with self._engine_lock:
+            if self._ocr_engine is not None:
+                return
             try:
-                import easyocr
-                self.easy_reader = easyocr.Reader(['en'], gpu=False)
-                self.ocr_engine = "easyocr"
-                print("✅ EasyOCR loaded successfully (PaddleOCR unavailable)")
-            except ImportError:
-                print("⚠️  No OCR engine available, using mock OCR for testing")
+                from paddleocr import PaddleOCR
+                options = {}
+                if settings.OCR_ONNX_MODEL_DIR:
+                    # Quantized ONNX exports on ONNX Runtime (INT8 recognizer: roughly
+                    # twice the FP32 throughput on CPU, where it dominates per-box cost)
+                    onnx_dir = settings.OCR_ONNX_MODEL_DIR
+                    options.update(
+                        use_onnx=True,
+                        det_model_dir=os.path.join(onnx_dir, "det.onnx"),
+                        rec_model_dir=os.path.join(onnx_dir, "rec.onnx"),
+                        cls_model_dir=os.path.join(onnx_dir, "cls.onnx"),
+                    )
+                elif settings.OCR_USE_TENSORRT:
+                    # Paddle Inference builds the TRT engines; the tuned dynamic-shape
+                    # file it needs is collected on the first run and cached next to
+                    # the model, so TensorRT is used from the second start onwards
+                    options.update(use_gpu=True, use_tensorrt=True, precision="fp16")
+                if options.get("use_onnx"):
+                    with _ort_providers() as providers:
+                        self.paddle_reader = PaddleOCR(use_angle_cls=True, lang='en', show_log=False, **options)
+                    variant = f" (ONNX Runtime: {providers[0]})"
+                else:
+                    self.paddle_reader = PaddleOCR(use_angle_cls=True, lang='en', show_log=False, **options)
+                    variant = " (TensorRT FP16)" if options else ""
+                self._ocr_engine = "paddleocr"
+                print(f"✅ PaddleOCR loaded successfully{variant}")
+            except Exception:
+                try:
+                    import easyocr
+                    # GPU when torch sees one (cudnn autotuning for the fixed crop
+                    # shapes); otherwise dynamic INT8 detector/recognizer weights on CPU
+                    cuda = _torch_cuda_available()
+                    self.easy_reader = easyocr.Reader(['en'], gpu=cuda, quantize=not cuda, cudnn_benchmark=cuda)
+                    self._ocr_engine = "easyocr"
+                    print(f"✅ EasyOCR loaded successfully on {'CUDA' if cuda else 'CPU'} (PaddleOCR unavailable)")
+                except ImportError:
+                    self._ocr_engine = "mock"
+                    print("⚠️  No OCR engine available, using mock OCR for testing")
+            self._warm_up()
+
+    def _warm_up(self) -> None:
+        # The first inference pays one-off allocator/kernel (and cudnn autotune)
+        # setup; absorb it on a synthetic text crop so the first real frame isn't slow
+        if not settings.OCR_WARMUP or self._ocr_engine == "mock":
+            return
+        try:
+            crop = np.full((64, 256), 255, dtype=np.uint8)
+            cv2.putText(crop, "PSA 10", (16, 44), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+            if self._ocr_engine == "paddleocr":
+                self.paddle_reader.ocr(crop, cls=True)
+            else:
+                self.easy_reader.readtext(crop)
+        except Exception as e:
+            print(f"OCR warm-up failed: {e}")
+
+    def warmup(self) -> None:
+        """Load (and warm) the OCR engine now rather than on the first OCR call.
+
+        Blocking, and it puts the model in the calling process: callers that want
+        it ready before their first frame (e.g. users of whatsnot_detector) call
+        this explicitly, off the event loop.
+        """
+        self._load_engine()
+
+    @staticmethod
+    def _engine_installed() -> bool:
+        """Whether a real OCR engine can be imported, without importing it."""
+        return any(importlib.util.find_spec(name) for name in ("paddleocr", "easyocr"))
 
     # ------------------------------------------------------------------
     # Public async API
@@ -34,11 +219,16 @@ class OCRService:
     async def extract_text(self, image: np.ndarray) -> Dict:
         """Extract text from a full image (single-region, kept for back-compat)."""
         try:
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(self.executor, self._run_ocr, image)
+            async with self._sem:
+                loop = asyncio.get_event_loop()
+                return await loop.run_in_executor(self.executor, self._run_ocr, image)
         except Exception as e:
             print(f"OCR Error: {e}")
-            return {"texts": [], "confidence": 0, "card_info": {}, "text": "", "ocr_engine": self.ocr_engine}
+            return {"texts": [], "confidence": 0, "card_info": {}, "text": "", "ocr_engine": self._ocr_engine or "unknown"}
+
+    async def extract_text_batch(self, images: List[np.ndarray]) -> List[Dict]:
+        """Extract text from several images concurrently (up to OCR_CONCURRENCY at once)."""
+        return list(await asyncio.gather(*(self.extract_text(image) for image in images)))
 
     async def extract_text_dual_region(self, image: np.ndarray) -> Dict:
         """
@@ -46,20 +236,71 @@ class OCRService:
 
         Title crop (top 20%): card name, year, set, grade.
         Bid crop   (bottom 25%): current bid, timer.
+
+        With a real OCR engine loaded this runs in a worker process, so inference
+        does not contend for the server's GIL.
         """
         loop = asyncio.get_event_loop()
-        title_crop = self._crop_title_region(image)
-        bid_crop = self._crop_bid_region(image)
-
-        title_result, bid_result = await asyncio.gather(
-            loop.run_in_executor(self.executor, self._run_ocr, title_crop),
-            loop.run_in_executor(self.executor, self._run_ocr, bid_crop),
+        async with self._sem:
+            # A worker that dies (OOM, native crash) breaks the whole pool: replace it
+            # once and retry rather than failing every later frame
+            for _attempt in range(2):
+                pool = self._get_process_pool()
+                if pool is None:
+                    break
+                # Ship raw bytes rather than pickling the ndarray
+                image = np.ascontiguousarray(image)
+                try:
+                    return await loop.run_in_executor(
+                        pool, _ocr_dual_region_worker, image.tobytes(), image.shape, image.dtype.str
+                    )
+                except BrokenProcessPool as e:
+                    print(f"OCR process pool broke, restarting it: {e}")
+                    self._discard_process_pool(pool)
+            else:
+                raise RuntimeError("OCR process pool keeps breaking")
+            return await loop.run_in_executor(self.executor, self._dual_region_sync, image)
+
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        # CPU inference only: with TensorRT every worker would build its own engines
+        # and hold its own copy of the model in GPU memory
+        if (
+            self._process_pool is None
+            and settings.OCR_PROCESS_WORKERS > 0
+            and not settings.OCR_USE_TENSORRT
+            and self._engine_installed()
+        ):
+            # spawn, not fork: the server process already runs executor, cache and
+            # audio threads (and holds their locks) that a fork would copy mid-state
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=settings.OCR_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_ocr_worker_init,
+            )
+        return self._process_pool
+
+    def _discard_process_pool(self, pool: ProcessPoolExecutor) -> None:
+        if self._process_pool is pool:
+            self._process_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _dual_region_sync(self, image: np.ndarray) -> Dict:
+        """Synchronous dual-region OCR; both crops go through the engine in one batch."""
+        # Both crops are full-width, so one scale covers them
+        crops = [self._crop_title_region(image), self._crop_bid_region(image)]
+        scale = self._ocr_scale(image)
+        if scale < 1.0:
+            crops = [self._downscale(crop, scale) for crop in crops]
+        title_result, bid_result = (
+            self._unscale_boxes(result, scale) for result in self._run_ocr_batch(crops)
         )
+        return self._merge_region_results(title_result, bid_result)
 
+    def _merge_region_results(self, title_result: Dict, bid_result: Dict) -> Dict:
         merged_texts = title_result["texts"] + bid_result["texts"]
         merged_text = title_result["text"] + " " + bid_result["text"]
         combined_confidence = (title_result["confidence"] + bid_result["confidence"]) / 2
-        card_info = self._extract_card_info(merged_texts)
+        card_info = self._extract_card_info(merged_texts, joined=merged_text)
 
         return {
             "texts": merged_texts,
@@ -75,7 +316,7 @@ class OCRService:
             return self._run_ocr(image_path_or_array)
         except Exception as e:
             print(f"OCR Error: {e}")
-            return {"texts": [], "confidence": 0, "card_info": {}, "text": "", "ocr_engine": self.ocr_engine}
+            return {"texts": [], "confidence": 0, "card_info": {}, "text": "", "ocr_engine": self._ocr_engine or "unknown"}
 
     # ------------------------------------------------------------------
     # Region cropping
@@ -91,11 +332,34 @@ class OCRService:
         h = image.shape[0]
         return image[int(h * 0.75):, :]
 
+    @staticmethod
+    def _ocr_scale(image: np.ndarray) -> float:
+        return min(1.0, _OCR_MAX_WIDTH / image.shape[1]) if image.shape[1] else 1.0
+
+    @staticmethod
+    def _downscale(image: np.ndarray, scale: float) -> np.ndarray:
+        return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def _unscale_boxes(result: Dict, scale: float) -> Dict:
+        """Map boxes found on a downsampled image back to its original resolution."""
+        if scale >= 1.0:
+            return result
+        # New text dicts: results may share theirs (the mock does)
+        result["texts"] = [
+            {**t, "bbox": [[x / scale, y / scale] for x, y in t["bbox"]]} for t in result["texts"]
+        ]
+        return result
+
     # ------------------------------------------------------------------
     # Engine dispatch
     # ------------------------------------------------------------------
 
     def _run_ocr(self, image) -> Dict:
+        if not isinstance(image, str):
+            scale = self._ocr_scale(image)
+            if scale < 1.0:
+                return self._unscale_boxes(self._run_ocr(self._downscale(image, scale)), scale)
         if self.ocr_engine == "paddleocr":
             try:
                 return self._run_paddle_ocr(image)
@@ -107,13 +371,92 @@ class OCRService:
             return self._run_easy_ocr(image)
         return self._mock_ocr_result()
 
+    def _run_ocr_batch(self, images: List[np.ndarray]) -> List[Dict]:
+        """OCR several crops with one detector/recognizer pass; one result per crop."""
+        if self.ocr_engine == "paddleocr":
+            try:
+                return self._run_paddle_ocr_batch(images)
+            except Exception as e:
+                print(f"PaddleOCR error, falling back: {e}")
+                if self.easy_reader:
+                    return self._run_easy_ocr_batch(images)
+        elif self.ocr_engine == "easyocr":
+            return self._run_easy_ocr_batch(images)
+        return [self._mock_ocr_result() for _ in images]
+
+    def _run_paddle_ocr_batch(self, images: List[np.ndarray]) -> List[Dict]:
+        """Stack the crops vertically (white gap between) and run PaddleOCR once.
+
+        Boxes are assigned back to their crop by vertical centre and shifted into
+        that crop's coordinates.
+        """
+        # Stacking needs one channel count throughout
+        processed = [_as_gray(self._preprocess_image(img)) for img in images]
+        width = max(img.shape[1] for img in processed)
+        rows, offsets, y = [], [], 0
+        for img in processed:
+            if img.shape[1] < width:
+                img = cv2.copyMakeBorder(img, 0, 0, 0, width - img.shape[1], cv2.BORDER_CONSTANT, value=255)
+            offsets.append(y)
+            rows.append(img)
+            y += img.shape[0]
+            rows.append(np.full((_BATCH_GAP_PX, width), 255, dtype=img.dtype))
+            y += _BATCH_GAP_PX
+        with self._paddle_lock:
+            raw = self.paddle_reader.ocr(np.vstack(rows[:-1]), cls=True)
+
+        texts: List[List[Dict]] = [[] for _ in images]
+        for page in (raw or []):
+            if page is None:
+                continue
+            for box, (text, score) in page:
+                centre = sum(pt[1] for pt in box) / len(box)
+                # A box reaching above the first crop still belongs to it
+                idx = max(bisect.bisect_right(offsets, centre) - 1, 0)
+                top = offsets[idx]
+                box = [[pt[0], pt[1] - top] for pt in box]
+                texts[idx].append({"text": text, "confidence": score, "bbox": box})
+        return [self._build_result(t, "paddleocr") for t in texts]
+
+    def _run_easy_ocr_batch(self, images: List[np.ndarray]) -> List[Dict]:
+        """EasyOCR readtext_batched over the crops, padded to one common size."""
+        processed = [_as_gray(self._preprocess_image(img)) for img in images]
+        height = max(img.shape[0] for img in processed)
+        width = max(img.shape[1] for img in processed)
+        # Pad bottom/right only, so box coordinates stay in each crop's own frame
+        padded = [
+            cv2.copyMakeBorder(
+                img, 0, height - img.shape[0], 0, width - img.shape[1], cv2.BORDER_CONSTANT, value=255
+            )
+            for img in processed
+        ]
+        with self._easy_lock:
+            batched = self.easy_reader.readtext_batched(padded, n_width=width, n_height=height)
+        return [
+            self._build_result(
+                [{"text": text, "confidence": conf, "bbox": bbox} for (bbox, text, conf) in results],
+                "easyocr",
+            )
+            for results in batched
+        ]
+
+    def _build_result(self, texts: List[Dict], engine: str) -> Dict:
+        avg_confidence = sum(t["confidence"] for t in texts) / len(texts) if texts else 0.0
+        text = " ".join(t["text"] for t in texts)
+        return {
+            "texts": texts,
+            "confidence": avg_confidence,
+            "card_info": self._extract_card_info(texts, joined=text),
+            "text": text,
+            "ocr_engine": engine,
+        }
+
     def _run_paddle_ocr(self, image) -> Dict:
         """Run PaddleOCR and normalise output to the shared dict shape."""
-        if isinstance(image, str):
+        if not isinstance(image, str):
+            image = self._preprocess_image(image)
+        with self._paddle_lock:
             raw = self.paddle_reader.ocr(image, cls=True)
-        else:
-            processed = self._preprocess_image(image)
-            raw = self.paddle_reader.ocr(processed, cls=True)
 
         texts = []
         total_confidence = 0.0
@@ -128,23 +471,23 @@ class OCRService:
                 total_confidence += score
 
         avg_confidence = total_confidence / len(texts) if texts else 0.0
-        card_info = self._extract_card_info(texts)
+        text = " ".join(t["text"] for t in texts)
+        card_info = self._extract_card_info(texts, joined=text)
 
         return {
             "texts": texts,
             "confidence": avg_confidence,
             "card_info": card_info,
-            "text": " ".join(t["text"] for t in texts),
+            "text": text,
             "ocr_engine": "paddleocr",
         }
 
     def _run_easy_ocr(self, image) -> Dict:
         """Run EasyOCR and normalise output to the shared dict shape."""
-        if isinstance(image, str):
+        if not isinstance(image, str):
+            image = self._preprocess_image(image)
+        with self._easy_lock:
             results = self.easy_reader.readtext(image)
-        else:
-            processed = self._preprocess_image(image)
-            results = self.easy_reader.readtext(processed)
 
         texts = []
         total_confidence = 0.0
@@ -154,53 +497,38 @@ class OCRService:
             total_confidence += confidence
 
         avg_confidence = total_confidence / len(results) if results else 0.0
-        card_info = self._extract_card_info(texts)
+        text = " ".join(t["text"] for t in texts)
+        card_info = self._extract_card_info(texts, joined=text)
 
         return {
             "texts": texts,
             "confidence": avg_confidence,
             "card_info": card_info,
-            "text": " ".join(t["text"] for t in texts),
+            "text": text,
             "ocr_engine": "easyocr",
         }
 
     def _mock_ocr_result(self) -> Dict:
         """Mock result for testing when no OCR engine is available."""
-        mock_texts = [
-            {"text": "2023", "confidence": 0.95, "bbox": [[100, 50], [150, 50], [150, 70], [100, 70]]},
-            {"text": "Topps", "confidence": 0.90, "bbox": [[100, 80], [160, 80], [160, 100], [100, 100]]},
-            {"text": "Mike Trout", "confidence": 0.88, "bbox": [[100, 110], [200, 110], [200, 130], [100, 130]]},
-            {"text": "PSA 10", "confidence": 0.92, "bbox": [[100, 140], [160, 140], [160, 160], [100, 160]]},
-            {"text": "#27", "confidence": 0.85, "bbox": [[100, 170], [140, 170], [140, 190], [100, 190]]},
-        ]
-        card_info = {
-            "player_name": "Mike Trout",
-            "year": "2023",
-            "set_name": "Topps",
-            "card_number": "27",
-            "grade": "PSA 10",
-            "rookie": False,
-        }
-        return {
-            "texts": mock_texts,
-            "confidence": 0.90,
-            "card_info": card_info,
-            "text": "2023 Topps Mike Trout PSA 10 #27",
-            "ocr_engine": "mock",
-        }
+        # Fresh top level and card_info (callers may annotate them); the texts
+        # tuple is shared and never mutated in place
+        return {**_MOCK_OCR_RESULT, "card_info": dict(_MOCK_OCR_RESULT["card_info"])}
 
     # ------------------------------------------------------------------
     # Pre-processing
     # ------------------------------------------------------------------
 
     def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
-        """Grayscale + adaptive threshold + denoise for better OCR accuracy."""
+        """Grayscale + adaptive threshold for better OCR accuracy."""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if len(image.shape) == 3 else image
+            src = cv2.UMat(image) if _USE_OPENCL else image
+            gray = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else src
+            # No denoise pass: on a 0/255 mask fastNlMeansDenoising (h=3) returns its
+            # input unchanged, at ~100x the cost of everything else here
             thresh = cv2.adaptiveThreshold(
                 gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
             )
-            return cv2.fastNlMeansDenoising(thresh)
+            return thresh.get() if _USE_OPENCL else thresh
         except Exception as e:
             print(f"Preprocessing error: {e}")
             return image
@@ -209,8 +537,11 @@ class OCRService:
     # Attribute extraction (shared by all engines)
     # ------------------------------------------------------------------
 
-    def _extract_card_info(self, texts: List[Dict]) -> Dict:
-        """Extract structured card attributes from a list of OCR text results."""
+    def _extract_card_info(self, texts: List[Dict], joined: Optional[str] = None) -> Dict:
+        """Extract structured card attributes from a list of OCR text results.
+
+        `joined` is the texts already joined with spaces, when the caller has it.
+        """
         card_info = {
             "player_name": None,
             "year": None,
@@ -220,21 +551,23 @@ class OCRService:
             "rookie": False,
         }
 
-        all_text = " ".join(t["text"] for t in texts)
+        all_text = " ".join(t["text"] for t in texts) if joined is None else joined
+        lower = all_text.lower()
+        hits = _CARD_SCANNER.hits(all_text)
 
-        year_match = re.search(r'\b(19[5-9]\d|20[0-2]\d)\b', all_text)
+        year_match = _YEAR_RE.search(all_text) if hits is None or "year" in hits else None
         if year_match:
             card_info["year"] = year_match.group(1)
 
-        grade_match = re.search(r'\b(PSA|BGS|SGC)\s*(\d+(?:\.\d+)?)\b', all_text, re.IGNORECASE)
+        grade_match = _GRADE_RE.search(all_text) if hits is None or "grade" in hits else None
         if grade_match:
             card_info["grade"] = f"{grade_match.group(1).upper()} {grade_match.group(2)}"
 
-        card_num_match = re.search(r'#(\d+)', all_text)
+        card_num_match = _CARD_NUM_RE.search(all_text) if hits is None or "card_number" in hits else None
         if card_num_match:
             card_info["card_number"] = card_num_match.group(1)
 
-        if any(w in all_text.lower() for w in ['rookie', 'rc', 'rookie card']):
+        if ("rookie" in hits) if hits is not None else any(w in lower for w in ['rookie', 'rc']):
             card_info["rookie"] = True
 
         words = all_text.split()
@@ -242,21 +575,33 @@ class OCRService:
             w for w in words
             if w.istitle()
             and len(w) > 2
-            and not re.match(r'\d+', w)
-            and w.upper() not in {'PSA', 'BGS', 'SGC', 'TOPPS', 'PANINI', 'BOWMAN'}
+            and not _LEADING_DIGIT_RE.match(w)
+            and w.upper() not in _NAME_EXCLUDE
         ]
         if len(name_candidates) >= 2:
             card_info["player_name"] = " ".join(name_candidates[:2])
         elif name_candidates:
             card_info["player_name"] = name_candidates[0]
 
-        for kw in ['topps', 'panini', 'bowman', 'upper deck', 'donruss']:
-            if kw in all_text.lower():
+        for kw in _CARD_SET_KEYWORDS:
+            if (kw in lower) if hits is None else (f"set:{kw}" in hits):
                 card_info["set_name"] = kw.title()
                 break
 
         return card_info
 
 
-# Singleton
+# Singleton — the engine loads on first OCR call, so with the process pool enabled
+# only the pool workers ever hold the model, each loading it once.
 ocr_service = OCRService()
+
+
+def _ocr_worker_init() -> None:
+    """Process-pool initializer: load the engine as the worker starts, not mid-task."""
+    ocr_service._load_engine()
+
+
+def _ocr_dual_region_worker(buf: bytes, shape: Tuple[int, ...], dtype: str) -> Dict:
+    """Process-pool entry point: rebuild the frame from raw bytes and OCR it."""
+    image = np.frombuffer(buf, dtype=np.dtype(dtype)).reshape(shape)
+    return ocr_service._dual_region_sync(image)
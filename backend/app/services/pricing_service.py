@@ -1,48 +1,119 @@
 import asyncio
-import json
 import logging
-from typing import Dict, List, Tuple
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
-from rapidfuzz import fuzz
+import aiohttp
+import numpy as np
+import orjson
+from rapidfuzz import fuzz, process, utils
 
 from app.config import settings
 from app.services.cache_service import cache_service
 
 logger = logging.getLogger(__name__)
 
+FINDING_URL = "https://svcs.ebay.com/services/search/FindingService/v1"
+
+# Claude-built search strings kept in memory (LRU), so a card whose priced result
+# has expired or was evicted doesn't cost another LLM round-trip
+QUERY_CACHE_SIZE = 2048
+
+
+def _finding_field(node, *keys):
+    """Walk a Finding API JSON node; every field there is wrapped in a one-item list."""
+    for key in keys:
+        value = node.get(key) if isinstance(node, dict) else None
+        if not value:
+            return None
+        node = value[0] if isinstance(value, list) else value
+    return node
+
+
+def _to_float(value) -> Optional[float]:
+    """A listing price as float, or None if eBay sent something unparseable."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
 
 class PricingService:
     def __init__(self):
-        self._ebay_api = None  # lazy-init so import errors don't break startup
+        # Created on first use: the session binds to the running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Single-flight: concurrent lookups for the same card share one in-flight task
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Keeps concurrent lookups (batches included) inside eBay's rate limits
+        self._ebay_sem = asyncio.Semaphore(settings.EBAY_MAX_CONCURRENCY)
+        self._query_cache: "OrderedDict[str, str]" = OrderedDict()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # One keep-alive pool for every eBay call instead of a handshake per search
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=15, connect=5),
+            )
+        return self._session
 
-    def _get_ebay_api(self):
-        if self._ebay_api is None:
-            from ebaysdk.finding import Connection as Finding
-            self._ebay_api = Finding(appid=settings.EBAY_APP_ID, config_file=None)
-        return self._ebay_api
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     async def get_card_prices(self, card_info: Dict) -> Dict:
+        """Fetch card prices, coalescing concurrent requests for the same card."""
+        return await self._get_card_prices_keyed(card_info, cache_service._make_key(card_info))
+
+    async def _get_card_prices_keyed(self, card_info: Dict, key: str) -> Dict:
+        # The key is hashed once per lookup and shared by single-flight, the
+        # SQLite cache and the query LRU
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_card_prices(card_info, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        # shield: one caller being cancelled must not cancel the shared lookup
+        return await asyncio.shield(task)
+
+    async def get_many_card_prices(self, cards: List[Dict]) -> List[Dict]:
+        """Price several cards concurrently; results come back in input order.
+
+        Cards with the same cache key are looked up once.
+        """
+        keys = [cache_service._make_key(card) for card in cards]
+        unique: Dict[str, Dict] = {}
+        for key, card in zip(keys, cards):
+            unique.setdefault(key, card)
+        results = await asyncio.gather(
+            *(self._get_card_prices_keyed(card, key) for key, card in unique.items())
+        )
+        by_key = dict(zip(unique, results))
+        return [by_key[key] for key in keys]
+
+    async def _fetch_card_prices(self, card_info: Dict, key: str) -> Dict:
         """Fetch card prices: SQLite cache → Claude query → eBay → fuzzy filter."""
 
         # 1. Cache hit
-        cached = cache_service.get(card_info)
+        cached = cache_service.get_by_key(key)
         if cached:
             logger.debug("Pricing cache hit for %s", card_info.get("player_name"))
             return cached
 
         # 2. Build query (Claude-assisted when available, plain fallback otherwise)
-        query = await self._build_search_query_with_claude(card_info)
+        query = await self._build_search_query_with_claude(card_info, key)
 
         try:
             # 3. Primary eBay search
             prices, titles = await self._search_ebay_sold_with_titles(query)
 
             # 4. Zero-result fallback: broaden by dropping grade and card_number
-            if not prices:
+            if not prices.size:
                 broad_info = {
                     k: v for k, v in card_info.items()
                     if k not in ("card_number", "grade")
@@ -53,24 +124,31 @@ class PricingService:
                 query = broad_query  # record what we actually used
 
             # 5. Fuzzy-filter: keep only listings matching the query well enough
-            if titles:
+            if prices.size:
                 prices = self._fuzzy_filter_prices(query, prices, titles)
 
         except Exception as e:
             logger.error("eBay search failed: %s", e)
-            prices, titles = [], []
+            prices, titles = np.empty(0), []
 
         result = self._calculate_price_stats(prices, query)
-        cache_service.set(card_info, result, query)
+        cache_service.set_by_key(key, result, query)
         return result
 
     # ------------------------------------------------------------------
     # Query construction
     # ------------------------------------------------------------------
 
-    async def _build_search_query_with_claude(self, card_info: Dict) -> str:
+    async def _build_search_query_with_claude(self, card_info: Dict, key: Optional[str] = None) -> str:
         """Use Claude to build an optimised eBay search string (≤60 chars).
         Falls back to the plain concatenation method if Claude is unavailable."""
+        # Keyed like the pricing cache: a different card number is a different card
+        if key is None:
+            key = cache_service._make_key(card_info)
+        query = self._query_cache.get(key)
+        if query is not None:
+            self._query_cache.move_to_end(key)
+            return query
         try:
             from app.services.claude_service import claude_service
             if not claude_service.is_available():
@@ -78,17 +156,17 @@ class PricingService:
 
             prompt = (
                 "Build a concise eBay sold listing search query for this sports card.\n"
-                f"Card: {json.dumps(card_info)}\n"
+                f"Card: {orjson.dumps(card_info).decode()}\n"
                 "Return ONLY the search string, no explanation. "
                 "Prioritize player name, year, set, grade. "
                 "Omit fields that add noise. Max 60 characters."
             )
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, claude_service._call_claude_api, prompt
-            )
+            result = await claude_service._call_claude_api(prompt)
             query = result.strip().strip('"')[:60]
             logger.debug("Claude query: %s", query)
+            self._query_cache[key] = query
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
             return query
         except Exception as e:
             logger.warning("Claude query construction failed, using fallback: %s", e)
@@ -113,60 +191,76 @@ class PricingService:
     # eBay search
     # ------------------------------------------------------------------
 
-    async def _search_ebay_sold_with_titles(self, query: str) -> Tuple[List[float], List[str]]:
-        """Search eBay completed/sold listings; return parallel (prices, titles) lists."""
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, self._ebay_api_call, query)
-
-        prices: List[float] = []
-        titles: List[str] = []
+    async def _search_ebay_sold_with_titles(self, query: str) -> Tuple[np.ndarray, List[str]]:
+        """Search eBay completed/sold listings; return parallel (prices, titles)."""
+        response = await self._ebay_api_call(query)
+        ack = _finding_field(response, "ack")
+        if ack not in ("Success", "Warning"):
+            raise RuntimeError(
+                _finding_field(response, "errorMessage", "error", "message") or f"eBay ack: {ack}"
+            )
 
-        if hasattr(response.reply, "searchResult") and response.reply.searchResult:
-            for item in response.reply.searchResult.item:
-                try:
-                    price = float(item.sellingStatus.currentPrice.value)
-                    title = str(item.title)
-                    prices.append(price)
-                    titles.append(title)
-                except Exception:
-                    continue
+        items = (_finding_field(response, "searchResult") or {}).get("item", [])
 
-        return prices, titles
+        # Listings without a parseable sold price are skipped
+        priced = [
+            (price, _finding_field(item, "title") or "")
+            for item in items
+            if (price := _to_float(_finding_field(item, "sellingStatus", "currentPrice", "__value__"))) is not None
+        ]
+        prices = np.fromiter((price for price, _ in priced), dtype=np.float64, count=len(priced))
+        return prices, [title for _, title in priced]
 
-    def _ebay_api_call(self, query: str):
-        return self._get_ebay_api().execute("findCompletedItems", {
+    async def _ebay_api_call(self, query: str) -> Dict:
+        """findCompletedItems over the Finding API's JSON binding."""
+        params = {
             "keywords": query,
             "categoryId": "212",  # Sports Trading Cards
             "sortOrder": "EndTimeSoonest",
-            "itemFilter": [
-                {"name": "SoldItemsOnly", "value": "true"},
-                {"name": "Condition", "value": "Used"},
-            ],
-            "paginationInput": {"entriesPerPage": 25},
-        })
+            "itemFilter(0).name": "SoldItemsOnly",
+            "itemFilter(0).value": "true",
+            "itemFilter(1).name": "Condition",
+            "itemFilter(1).value": "Used",
+            "paginationInput.entriesPerPage": "25",
+        }
+        headers = {
+            "X-EBAY-SOA-OPERATION-NAME": "findCompletedItems",
+            "X-EBAY-SOA-SERVICE-VERSION": "1.13.0",
+            "X-EBAY-SOA-SECURITY-APPNAME": settings.EBAY_APP_ID,
+            "X-EBAY-SOA-GLOBAL-ID": "EBAY-US",
+            "X-EBAY-SOA-RESPONSE-DATA-FORMAT": "JSON",
+        }
+        async with self._ebay_sem:
+            async with self._get_session().get(FINDING_URL, params=params, headers=headers) as resp:
+                resp.raise_for_status()
+                body = await resp.json(loads=orjson.loads, content_type=None)
+        return _finding_field(body, "findCompletedItemsResponse") or {}
 
     # ------------------------------------------------------------------
     # Fuzzy filtering
     # ------------------------------------------------------------------
 
     def _fuzzy_filter_prices(
-        self, query: str, prices: List[float], titles: List[str]
-    ) -> List[float]:
+        self, query: str, prices: np.ndarray, titles: List[str]
+    ) -> np.ndarray:
         """Keep only prices whose listing title matches the query above the threshold.
         If everything is filtered out, return unfiltered (safety valve)."""
         threshold = settings.FUZZY_MATCH_THRESHOLD
-        kept = [
-            price for price, title in zip(prices, titles)
-            if fuzz.token_sort_ratio(query.lower(), title.lower()) >= threshold
-        ]
-        return kept if kept else prices
+        # One C call scores every title; below-cutoff scores come back as 0
+        scores = process.cdist(
+            [query], titles, scorer=fuzz.token_sort_ratio,
+            processor=utils.default_process, score_cutoff=threshold, workers=1,
+        )[0]
+        keep = scores >= threshold
+        return prices[keep] if keep.any() else prices
 
     # ------------------------------------------------------------------
     # Statistics
     # ------------------------------------------------------------------
 
-    def _calculate_price_stats(self, prices: List[float], query: str = "") -> Dict:
-        if not prices:
+    def _calculate_price_stats(self, prices: np.ndarray, query: str = "") -> Dict:
+        prices = np.asarray(prices, dtype=np.float64)
+        if not prices.size:
             return {
                 "count": 0, "prices": [], "average": 0.0, "median": 0.0,
                 "min_price": 0.0, "max_price": 0.0, "standard_deviation": 0.0,
@@ -174,21 +268,16 @@ class PricingService:
                 "timeframe": "Last 90 days", "query_used": query,
             }
 
-        prices_sorted = sorted(prices)
-        n = len(prices_sorted)
-        avg = sum(prices_sorted) / n
-        median = prices_sorted[n // 2]
-        variance = sum((p - avg) ** 2 for p in prices_sorted) / n
-        std_dev = variance ** 0.5
-
+        # Pure: the caller's array keeps eBay's order (most recently ended first).
+        # Results go back to Python floats for JSON and the SQLite cache.
         return {
-            "count": n,
-            "prices": prices_sorted[:10],  # most recent 10
-            "average": avg,
-            "median": median,
-            "min_price": prices_sorted[0],
-            "max_price": prices_sorted[-1],
-            "standard_deviation": std_dev,
+            "count": int(prices.size),
+            "prices": prices[:10].tolist(),  # most recent 10
+            "average": float(prices.mean()),
+            "median": float(np.median(prices)),
+            "min_price": float(prices.min()),
+            "max_price": float(prices.max()),
+            "standard_deviation": float(prices.std()),
             "sale_dates": [],
             "sources": ["eBay Sold"],
             "timeframe": "Last 90 days",
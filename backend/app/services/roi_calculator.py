@@ -1,15 +1,27 @@
+import re
+from types import MappingProxyType
 from typing import Dict, List
-import statistics
+
+import numpy as np
 
 from app.config import settings
 
 
 class ROICalculator:
-    GRADE_MULTIPLIERS = {
+    # Stateless: no per-instance dict
+    __slots__ = ()
+
+    # Read-only; _GRADE_PATTERN below is compiled from these keys
+    GRADE_MULTIPLIERS = MappingProxyType({
         "PSA 10": 2.5, "PSA 9": 1.8, "PSA 8": 1.3, "PSA 7": 1.0, "PSA 6": 0.7,
         "BGS 9.5": 2.2, "BGS 9": 1.6, "BGS 8.5": 1.2, "BGS 8": 1.0,
         "SGC 10": 2.0, "SGC 9": 1.5, "SGC 8": 1.1,
-    }
+    })
+    # One scan for any grade; longest first so "BGS 9.5" wins over "BGS 9"
+    _GRADE_PATTERN = re.compile(
+        "|".join(re.escape(k) for k in sorted(GRADE_MULTIPLIERS, key=len, reverse=True)),
+        re.IGNORECASE,
+    )
 
     # Approximate all-in resale fee (eBay ~13% + shipping buffer)
     RESALE_FEE_RATE = 0.15
@@ -90,8 +102,10 @@ class ROICalculator:
         if not prices:
             return {"min": 0, "max": 0, "estimated": 0}
 
-        recent_avg = statistics.mean(prices[:10])
-        std_dev = statistics.stdev(prices) if len(prices) > 1 else recent_avg * 0.2
+        # Mean and spread over the same recent window
+        recent = np.asarray(prices[:10], dtype=np.float64)
+        recent_avg = float(recent.mean())
+        std_dev = float(recent.std(ddof=1)) if recent.size > 1 else recent_avg * 0.2
 
         multiplier = self._get_grade_multiplier(card_info.get("grade", ""))
         estimated = recent_avg * multiplier
@@ -101,11 +115,8 @@ class ROICalculator:
         return {"min": fair_min, "max": fair_max, "estimated": estimated}
 
     def _get_grade_multiplier(self, grade: str) -> float:
-        grade_upper = grade.upper() if grade else ""
-        for grade_key, multiplier in self.GRADE_MULTIPLIERS.items():
-            if grade_key.upper() in grade_upper:
-                return multiplier
-        return 1.0
+        match = self._GRADE_PATTERN.search(grade or "")
+        return self.GRADE_MULTIPLIERS[match.group(0).upper()] if match else 1.0
 
     def _generate_recommendation(self, roi_potential: float, pricing_data: Dict) -> Dict:
         price_count = len(pricing_data.get("prices", []))
@@ -2,22 +2,75 @@
 # Modified version that works without tkinter
 
 import asyncio
-import base64
-import io
+import threading
 import time
+from functools import partial
 from typing import Dict, Optional, Callable, Any
 import cv2
 import numpy as np
 import mss
-from PIL import Image
+
+# libjpeg-turbo (SIMD) encoder when available; OpenCV's bundled libjpeg otherwise
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJPF_GRAY, TJSAMP_GRAY
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
+
+# Frame formats capture_frame can produce from mss's BGRA, and the conversion for each.
+# Colour frames are BGR, OpenCV's native order, like VOD frames from VideoCapture;
+# "gray" is enough for OCR and frame hashing and moves a third of the bytes.
+_COLOR_CONVERSIONS = {
+    "bgr": cv2.COLOR_BGRA2BGR,
+    "gray": cv2.COLOR_BGRA2GRAY,
+}
 
 class ScreenCaptureService:
-    def __init__(self):
+    # Preview frames are downscaled before encoding — the UI never shows them full size
+    PREVIEW_SCALE = 0.5
+    JPEG_QUALITY = 70
+
+    def __init__(self, color_mode: str = "bgr"):
+        if color_mode not in _COLOR_CONVERSIONS:
+            raise ValueError(f"Unsupported color_mode: {color_mode!r}")
+        self.color_mode = color_mode
         self.capture_region: Optional[Dict] = None
         self.is_capturing = False
-        self.sct = mss.mss()
+        # mss handles aren't thread-safe: one per thread, created on first use.
+        # Every handle is also tracked so close() can release them all.
+        self._local = threading.local()
+        self._scts: list = []
+        self._sct_lock = threading.Lock()
+        # Reused for every frame; (re)allocated when the region size changes
+        self._frame_buf: Optional[np.ndarray] = None
+        # Raw BGRA bytes of the last grab; an identical grab reuses _frame_buf as is
+        self._last_raw: Optional[bytearray] = None
+        self.frame_unchanged = False
         self.default_region = {"top": 100, "left": 100, "width": 800, "height": 600}
         
+    @property
+    def sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = self._local.sct = mss.mss()
+            with self._sct_lock:
+                self._scts.append(sct)
+        return sct
+
+    def close(self) -> None:
+        """Release every mss handle (X display / GDI device contexts) this service opened.
+
+        Call once capture has stopped; a later capture opens fresh handles.
+        """
+        with self._sct_lock:
+            handles, self._scts = self._scts, []
+        self._local = threading.local()
+        for sct in handles:
+            try:
+                sct.close()
+            except Exception as e:
+                print(f"❌ Closing screen capture handle failed: {e}")
+
     def select_capture_region(self) -> Optional[Dict]:
         """
         For headless mode, return a default region.
@@ -45,7 +98,11 @@ class ScreenCaptureService:
         return self.capture_region
     
     def capture_frame(self) -> Optional[np.ndarray]:
-        """Capture a single frame from the selected region"""
+        """Capture a single frame (BGR, or grayscale per color_mode) from the selected region.
+
+        The returned array is overwritten by the next capture. `frame_unchanged`
+        is set when the screen was pixel-identical to the previous grab.
+        """
         if not self.capture_region:
             print("❌ No capture region selected")
             return None
@@ -54,34 +111,54 @@ class ScreenCaptureService:
             # Capture screen region
             screenshot = self.sct.grab(self.capture_region)
             
-            # Convert to numpy array
-            frame = np.array(screenshot)
+            # memcmp against the previous grab: a static screen skips the conversion
+            raw = screenshot.raw
+            self.frame_unchanged = self._frame_buf is not None and raw == self._last_raw
+            self._last_raw = raw
+            if self.frame_unchanged:
+                return self._frame_buf
+            
+            # View mss's BGRA buffer in place (np.array() would copy it)
+            h, w = screenshot.height, screenshot.width
+            bgra = np.frombuffer(raw, dtype=np.uint8).reshape(h, w, 4)
+            
+            shape = (h, w) if self.color_mode == "gray" else (h, w, 3)
+            if self._frame_buf is None or self._frame_buf.shape != shape:
+                self._frame_buf = np.empty(shape, dtype=np.uint8)
             
-            # Convert BGRA to RGB (mss returns BGRA)
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2RGB)
+            # Convert straight into the reused frame buffer
+            cv2.cvtColor(bgra, _COLOR_CONVERSIONS[self.color_mode], dst=self._frame_buf)
             
-            return frame
+            return self._frame_buf
             
         except Exception as e:
             print(f"❌ Frame capture failed: {e}")
             return None
     
-    def frame_to_base64(self, frame: np.ndarray) -> str:
-        """Convert frame to base64 string for transmission"""
+    def frame_to_jpeg(self, frame: np.ndarray) -> bytes:
+        """Encode a downscaled frame as JPEG bytes (sent as a binary Socket.IO attachment)"""
         try:
-            # Convert to PIL Image
-            pil_image = Image.fromarray(frame)
+            if self.PREVIEW_SCALE != 1.0:
+                h, w = frame.shape[:2]
+                frame = cv2.resize(
+                    frame, (int(w * self.PREVIEW_SCALE), int(h * self.PREVIEW_SCALE)),
+                    interpolation=cv2.INTER_AREA
+                )
             
-            # Convert to base64
-            buffer = io.BytesIO()
-            pil_image.save(buffer, format='JPEG', quality=85)
-            img_str = base64.b64encode(buffer.getvalue()).decode()
+            if _turbo_jpeg is not None:
+                if frame.ndim == 2:
+                    return _turbo_jpeg.encode(
+                        frame[:, :, None], quality=self.JPEG_QUALITY,
+                        pixel_format=TJPF_GRAY, jpeg_subsample=TJSAMP_GRAY
+                    )
+                return _turbo_jpeg.encode(frame, quality=self.JPEG_QUALITY, pixel_format=TJPF_BGR)
             
-            return f"data:image/jpeg;base64,{img_str}"
+            ok, buf = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.JPEG_QUALITY])
+            return buf.tobytes() if ok else b""
             
         except Exception as e:
-            print(f"❌ Base64 conversion failed: {e}")
-            return ""
+            print(f"❌ JPEG encoding failed: {e}")
+            return b""
     
     async def start_capture_stream(self, process_callback: Callable, fps: int = 5):
         """Start continuous capture stream"""
@@ -89,31 +166,36 @@ class ScreenCaptureService:
             raise Exception("No capture region selected")
         
         self.is_capturing = True
+        self._last_raw = None  # the first frame of a stream always goes through
         frame_interval = 1.0 / fps
         frame_count = 0
+        settle_pending = False
         
         print(f"🎬 Starting capture stream at {fps} FPS")
         print(f"📍 Region: {self.capture_region}")
         
         try:
             while self.is_capturing:
-                start_time = time.time()
+                start_time = time.monotonic()
                 
                 # Capture frame
                 frame = self.capture_frame()
                 
-                if frame is not None:
+                # Pixel-identical ticks (common between card reveals) skip the callback:
+                # there is nothing new to preview or analyse. The first one after a
+                # change still goes through, with frame_unchanged set, so a callback
+                # that samples every Nth frame gets the frame the screen settled on.
+                if frame is not None and (not self.frame_unchanged or settle_pending):
+                    settle_pending = not self.frame_unchanged
                     frame_count += 1
                     
-                    # Convert to base64 for transmission
-                    frame_b64 = self.frame_to_base64(frame)
-                    
-                    # Call processing callback
+                    # Call processing callback; JPEG encoding is left to the
+                    # callback so frames that aren't previewed are never encoded
                     if process_callback:
-                        await process_callback(frame, frame_b64, frame_count)
+                        await process_callback(frame, partial(self.frame_to_jpeg, frame), frame_count)
                 
                 # Maintain frame rate
-                elapsed = time.time() - start_time
+                elapsed = time.monotonic() - start_time
                 sleep_time = max(0, frame_interval - elapsed)
                 
                 if sleep_time > 0:
@@ -204,20 +286,18 @@ class VODReplayService:
 
         try:
             while self._is_replaying:
+                # Frames that are dropped anyway are only demuxed (grab), not decoded
+                if not all(cap.grab() for _ in range(frame_skip - 1)):
+                    break  # end of video
                 ret, bgr_frame = cap.read()
                 if not ret:
                     break  # end of video
 
-                frame_num += 1
-                if frame_num % frame_skip != 0:
-                    continue
-
-                # BGR → RGB (same as live capture)
-                rgb_frame = cv2.cvtColor(bgr_frame, cv2.COLOR_BGR2RGB)
-                frame_b64 = screen_capture.frame_to_base64(rgb_frame)
+                frame_num += frame_skip
 
+                # Decoded frames are already BGR, the same as live capture
                 start = asyncio.get_event_loop().time()
-                await process_callback(rgb_frame, frame_b64, frame_num)
+                await process_callback(bgr_frame, partial(screen_capture.frame_to_jpeg, bgr_frame), frame_num)
                 elapsed = asyncio.get_event_loop().time() - start
                 sleep_time = max(0, frame_interval - elapsed)
                 if sleep_time:
@@ -272,8 +352,7 @@ if __name__ == "__main__":
         print(f"✅ Test capture successful! Frame shape: {frame.shape}")
         
         # Save test image
-        test_image = Image.fromarray(frame)
-        test_image.save("test_capture.jpg")
+        cv2.imwrite("test_capture.jpg", frame)
         print("💾 Test image saved as 'test_capture.jpg'")
     else:
         print("❌ Test capture failed!")
\ No newline at end of file
@@ -2,26 +2,36 @@
 Session log service — persists the last 50 analysis results per session to SQLite.
 Used for the session history REST endpoint and future replay features.
 """
+import atexit
 import json
 import logging
 import sqlite3
 import threading
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from collections import Counter
+from typing import Any, Dict, List, Tuple
 
 logger = logging.getLogger(__name__)
 
 _MAX_PER_SESSION = 50
+# A session is pruned once this many rows have been added since its last prune,
+# so it holds at most _MAX_PER_SESSION + _PRUNE_SLACK rows (reads still LIMIT 50)
+_PRUNE_SLACK = 25
 
 
 class SessionLogService:
     def __init__(self, db_path: str = "session_log.db"):
         self._db_path = db_path
         self._lock = threading.Lock()
+        # Rows inserted per session since it was last pruned (guarded by _lock)
+        self._unpruned: Counter = Counter()
+        # One connection for the service's lifetime, shared across threads under _lock
+        self._conn = self._connect()
         self._init_db()
+        atexit.register(self.close)
 
     def _init_db(self) -> None:
-        with self._connect() as conn:
+        with self._lock, self._conn as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS analysis_log (
@@ -32,52 +42,76 @@ class SessionLogService:
                 )
                 """
             )
+            # ids only grow (AUTOINCREMENT), so per-session id order is insertion
+            # order: both reads and pruning walk this index instead of sorting
+            conn.execute("DROP INDEX IF EXISTS idx_session")
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_session ON analysis_log(session_id, created_at)"
+                "CREATE INDEX IF NOT EXISTS idx_session_id ON analysis_log(session_id, id)"
             )
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self._db_path)
+        conn = sqlite3.connect(self._db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
         return conn
 
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def log(self, session_id: str, payload: Dict[str, Any]) -> None:
         """Insert one analysis record, then prune to the last _MAX_PER_SESSION entries."""
-        created_at = datetime.now(timezone.utc).isoformat()
-        payload_json = json.dumps(payload, default=str)
+        self.log_batch([(session_id, payload)])
 
-        with self._lock, self._connect() as conn:
-            conn.execute(
+    def log_batch(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Insert several (session_id, payload) records in one transaction.
+
+        Sessions that have grown _PRUNE_SLACK rows past their last prune are
+        trimmed back to _MAX_PER_SESSION in the same transaction.
+        """
+        if not entries:
+            return
+        rows = [
+            (session_id, json.dumps(payload, default=str), datetime.now(timezone.utc).isoformat())
+            for session_id, payload in entries
+        ]
+
+        with self._lock, self._conn as conn:
+            conn.executemany(
                 "INSERT INTO analysis_log (session_id, payload, created_at) VALUES (?,?,?)",
-                (session_id, payload_json, created_at),
-            )
-            # Prune: keep only the most recent _MAX_PER_SESSION rows for this session
-            conn.execute(
-                """
-                DELETE FROM analysis_log
-                WHERE session_id = ?
-                  AND id NOT IN (
-                      SELECT id FROM analysis_log
-                      WHERE session_id = ?
-                      ORDER BY created_at DESC
-                      LIMIT ?
-                  )
-                """,
-                (session_id, session_id, _MAX_PER_SESSION),
+                rows,
             )
+            self._unpruned.update(row[0] for row in rows)
+            due = [sid for sid in {row[0] for row in rows} if self._unpruned[sid] >= _PRUNE_SLACK]
+            for sid in due:
+                del self._unpruned[sid]
+            # Prune: keep only the most recent _MAX_PER_SESSION rows for each due
+            # session, i.e. drop everything older than the oldest id being kept
+            for sid in due:
+                oldest_kept = conn.execute(
+                    "SELECT id FROM analysis_log WHERE session_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+                    (sid, _MAX_PER_SESSION - 1),
+                ).fetchone()
+                if oldest_kept:
+                    conn.execute(
+                        "DELETE FROM analysis_log WHERE session_id = ? AND id < ?",
+                        (sid, oldest_kept[0]),
+                    )
 
     def get_session(self, session_id: str) -> List[Dict[str, Any]]:
         """Return up to _MAX_PER_SESSION records for the session, newest first."""
-        with self._lock, self._connect() as conn:
-            rows = conn.execute(
+        with self._lock:
+            rows = self._conn.execute(
                 """
                 SELECT payload, created_at FROM analysis_log
                 WHERE session_id = ?
-                ORDER BY created_at DESC
+                ORDER BY id DESC
                 LIMIT ?
                 """,
                 (session_id, _MAX_PER_SESSION),
@@ -1,14 +1,110 @@
 # backend/app/services/whatsnot_detector.py
 import cv2
 import numpy as np
+import copy
+import functools
 from typing import Dict, List, Optional, Tuple
 import re
+from collections import deque
 from .ocr_service import ocr_service
+from .whatsnot_parser import calculate_detection_confidence
+from ..utils.image_processing import frame_dhash, hamming_distance
+
+# Regions whose dHash is within this many bits of a recently OCR'd crop of the
+# same region reuse that crop's text instead of running EasyOCR again.
+# 16x16 hashes keep small text changes (a new bid) from colliding.
+REGION_HASH_SIZE = 16
+REGION_HASH_DISTANCE_THRESHOLD = 4
+REGION_CACHE_SIZE = 4
+
+# Frames wider than this are downscaled before region slicing. Matches the width
+# ocr_service caps OCR input at, so crops reach the OCR engine without a second resize.
+MAX_FRAME_WIDTH = 960
+
+_YEAR_RE = re.compile(r'\b(19[5-9]\d|20[0-2]\d)\b')
+# Patterns that ignore case run on pre-lowered text instead of using re.IGNORECASE
+_GRADE_RE = re.compile(r'\b(psa|bgs|sgc)\s*(\d+(?:\.\d+)?)\b')
+_CARD_NUM_RE = re.compile(r'#(\d+)')
+_BID_RE = re.compile(r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)')
+_TIME_RE = re.compile(r'(\d+[hm]|\d+:\d+)')
+_BID_COUNT_RE = re.compile(r'(\d+)\s*bid')
+# "rc" only as a whole word: as a substring it hit names like Marcus and words like search
+_ROOKIE_RE = re.compile(r'\brc\b|rookie')
+# Common non-player words that disqualify a name candidate
+_NAME_EXCLUDE_RE = re.compile(r'psa|bgs|card|lot')
+_PLAYER_PATTERNS = [
+    re.compile(r'\b([A-Z][a-z]+\s+[A-Z][a-z]+)\b'),  # First Last
+    re.compile(r'\b([A-Z]\.\s*[A-Z][a-z]+)\b'),      # F. Last
+]
+_COMMON_SETS = [
+    'topps', 'panini', 'upper deck', 'fleer', 'donruss', 'bowman',
+    'prizm', 'select', 'optic', 'mosaic', 'chronicles'
+]
+_SET_WORD_RES = {
+    set_name: re.compile(rf'\b\w*{set_name}\w*\b') for set_name in _COMMON_SETS
+}
+
+# Optional single-pass set-name scan: one Aho-Corasick walk over the header finds
+# every set keyword at once. Without pyahocorasick each keyword is searched in turn.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _build_set_automaton():
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for priority, set_name in enumerate(_COMMON_SETS):
+        automaton.add_word(set_name, (priority, set_name))
+    automaton.make_automaton()
+    return automaton
+
+
+_SET_AUTOMATON = _build_set_automaton()
+
+
+def _find_set_names(text_lower: str) -> List[Tuple[int, str]]:
+    """(first index, set name) for each set keyword in the text, in _COMMON_SETS order."""
+    if _SET_AUTOMATON is None:
+        return [(text_lower.find(set_name), set_name) for set_name in _COMMON_SETS if set_name in text_lower]
+    first: Dict[int, Tuple[int, str]] = {}
+    for end, (priority, set_name) in _SET_AUTOMATON.iter(text_lower):
+        first.setdefault(priority, (end - len(set_name) + 1, set_name))
+    return [first[priority] for priority in sorted(first)]
+
+
+@functools.lru_cache(maxsize=4)
+def _regions_for(height: int, width: int) -> Tuple[Tuple[str, Tuple[int, int, int, int]], ...]:
+    """Whatsnot layout regions for a frame size; captures keep one size for a whole stream."""
+    return (
+        # Top region - usually has seller/title info
+        ("header", (0, int(height * 0.15), 0, width)),
+
+        # Card display area - center of screen
+        ("card_area", (int(height * 0.15), int(height * 0.65), 0, width)),
+
+        # Bottom region - current bid, time remaining
+        ("auction_details", (int(height * 0.65), int(height * 0.85), 0, width)),
+
+        # Very bottom - buttons and controls
+        ("controls", (int(height * 0.85), height, 0, width)),
+
+        # Side regions for additional info
+        ("left_side", (int(height * 0.2), int(height * 0.8), 0, int(width * 0.25))),
+        ("right_side", (int(height * 0.2), int(height * 0.8), int(width * 0.75), width)),
+    )
+
 
 class WhatsnTCardDetector:
     def __init__(self):
         self.last_detection = None
         self.detection_confidence_threshold = 0.6
+        # region name -> recent (dhash, text) pairs, newest last
+        self._ocr_cache: Dict[str, deque] = {}
+        # (region hashes, results) of the last frame that ran the full pipeline
+        self._last_frame: Optional[Tuple[Dict[str, Optional[int]], Dict]] = None
         
     def detect_card_in_frame(self, frame: np.ndarray) -> Dict:
         """
@@ -20,7 +116,9 @@ class WhatsnTCardDetector:
             "card_info": {},
             "auction_info": {},
             "confidence": 0.0,
-            "debug_regions": []
+            "debug_regions": [],
+            # debug_regions are in processed-frame pixels: divide by this for the original frame
+            "debug_scale": 1.0
         }
         
         try:
@@ -30,8 +128,15 @@ class WhatsnTCardDetector:
             # Detect different regions of Whatsnot interface
             regions = self._identify_whatsnot_regions(processed_frame)
             
+            # A frame whose regions all hash-match the last fully processed one
+            # would parse to the same result. Hand out a copy: the cached dict may
+            # also be last_detection, and callers are free to mutate what they get.
+            region_hashes = self._hash_regions(processed_frame, regions)
+            if self._last_frame and self._regions_match(region_hashes, self._last_frame[0]):
+                return copy.deepcopy(self._last_frame[1])
+            
             # Extract text from each region
-            card_text = self._extract_text_from_regions(processed_frame, regions)
+            card_text = self._extract_text_from_regions(processed_frame, regions, region_hashes)
             
             # Parse card information
             card_info = self._parse_card_information(card_text)
@@ -48,11 +153,14 @@ class WhatsnTCardDetector:
                     "card_info": card_info,
                     "auction_info": auction_info,
                     "confidence": confidence,
-                    "debug_regions": regions
+                    "debug_regions": regions,
+                    "debug_scale": processed_frame.shape[1] / frame.shape[1]
                 })
                 
                 # Cache successful detection
                 self.last_detection = results
+            
+            self._last_frame = (region_hashes, results)
                 
         except Exception as e:
             print(f"Card detection error: {e}")
@@ -62,22 +170,16 @@ class WhatsnTCardDetector:
     
     def _preprocess_whatsnot_frame(self, frame: np.ndarray) -> np.ndarray:
         """Optimize frame for Whatsnot OCR"""
-        # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-        
-        # Apply adaptive thresholding
-        thresh = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-        )
-        
-        # Noise reduction
-        denoised = cv2.medianBlur(thresh, 3)
-        
-        # Sharpen text
-        kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-        sharpened = cv2.filter2D(denoised, -1, kernel)
-        
-        return sharpened
+        # Grayscale only: ocr_service adaptive-thresholds every crop it is given,
+        # so thresholding here as well just ran the filter twice. The median blur
+        # and sharpen that followed cost two full-frame passes for little gain
+        # (a 3x3 sharpen leaves a 0/255 image unchanged).
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        width = gray.shape[1]
+        if width > MAX_FRAME_WIDTH:
+            scale = MAX_FRAME_WIDTH / width
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return gray
     
     def _identify_whatsnot_regions(self, frame: np.ndarray) -> Dict[str, Tuple]:
         """
@@ -85,48 +187,65 @@ class WhatsnTCardDetector:
         Returns regions as (y1, y2, x1, x2) tuples
         """
         height, width = frame.shape[:2]
-        
-        regions = {
-            # Top region - usually has seller/title info
-            "header": (0, int(height * 0.15), 0, width),
-            
-            # Card display area - center of screen  
-            "card_area": (int(height * 0.15), int(height * 0.65), 0, width),
-            
-            # Bottom region - current bid, time remaining
-            "auction_details": (int(height * 0.65), int(height * 0.85), 0, width),
-            
-            # Very bottom - buttons and controls
-            "controls": (int(height * 0.85), height, 0, width),
-            
-            # Side regions for additional info
-            "left_side": (int(height * 0.2), int(height * 0.8), 0, int(width * 0.25)),
-            "right_side": (int(height * 0.2), int(height * 0.8), int(width * 0.75), width)
-        }
-        
-        return regions
+        return dict(_regions_for(height, width))
     
-    def _extract_text_from_regions(self, frame: np.ndarray, regions: Dict) -> Dict:
-        """Extract text from each identified region"""
-        text_results = {}
-        
+    def _hash_regions(self, frame: np.ndarray, regions: Dict) -> Dict[str, Optional[int]]:
+        """dHash of each region crop; None for empty or unhashable crops."""
+        hashes = {}
         for region_name, (y1, y2, x1, x2) in regions.items():
+            hashes[region_name] = None
             try:
-                # Extract region
                 region_img = frame[y1:y2, x1:x2]
-                
                 if region_img.size > 0:
-                    # Run OCR on region
-                    text_result = ocr_service.extract_text_easyocr(region_img)
-                    text_results[region_name] = text_result.get("text", "")
+                    hashes[region_name] = frame_dhash(region_img, REGION_HASH_SIZE)
+            except Exception as e:
+                print(f"Error hashing {region_name}: {e}")
+        return hashes
+
+    @staticmethod
+    def _regions_match(hashes: Dict[str, Optional[int]], other: Dict[str, Optional[int]]) -> bool:
+        if hashes.keys() != other.keys():
+            return False
+        for region_name, region_hash in hashes.items():
+            other_hash = other[region_name]
+            if region_hash is None or other_hash is None:
+                if region_hash != other_hash:
+                    return False
+            elif hamming_distance(region_hash, other_hash) >= REGION_HASH_DISTANCE_THRESHOLD:
+                return False
+        return True
+
+    def _extract_text_from_regions(self, frame: np.ndarray, regions: Dict, hashes: Dict[str, Optional[int]]) -> Dict:
+        """Extract text from each identified region"""
+        text_results = {}
+
+        for region_name, (y1, y2, x1, x2) in regions.items():
+            text_results[region_name] = ""
+            region_hash = hashes[region_name]
+            if region_hash is None:
+                continue
+            try:
+                cached = self._cached_region_text(region_name, region_hash)
+                if cached is not None:
+                    text_results[region_name] = cached
                 else:
-                    text_results[region_name] = ""
-                    
+                    # Run OCR on region
+                    text = ocr_service.extract_text_easyocr(frame[y1:y2, x1:x2]).get("text", "")
+                    self._ocr_cache[region_name].append((region_hash, text))
+                    text_results[region_name] = text
+
             except Exception as e:
                 print(f"Error extracting text from {region_name}: {e}")
-                text_results[region_name] = ""
-                
+
         return text_results
+
+    def _cached_region_text(self, region_name: str, region_hash: int) -> Optional[str]:
+        """Text of a recently OCR'd crop of this region within the hash threshold, if any."""
+        recent = self._ocr_cache.setdefault(region_name, deque(maxlen=REGION_CACHE_SIZE))
+        for cached_hash, cached_text in reversed(recent):
+            if hamming_distance(region_hash, cached_hash) < REGION_HASH_DISTANCE_THRESHOLD:
+                return cached_text
+        return None
     
     def _parse_card_information(self, text_data: Dict) -> Dict:
         """Parse card information from extracted text"""
@@ -147,6 +266,7 @@ class WhatsnTCardDetector:
             text_data.get("card_area", ""),
             text_data.get("auction_details", "")
         ])
+        combined_lower = combined_text.lower()
         
         # Extract player name (usually prominent in header/card area)
         player_match = self._extract_player_name(combined_text)
@@ -154,24 +274,23 @@ class WhatsnTCardDetector:
             card_info["player_name"] = player_match
         
         # Extract year (4-digit number, usually 1950-2025)
-        year_match = re.search(r'\b(19[5-9]\d|20[0-2]\d)\b', combined_text)
+        year_match = _YEAR_RE.search(combined_text)
         if year_match:
             card_info["year"] = year_match.group(1)
         
         # Extract grade (PSA 10, BGS 9.5, etc.)
-        grade_match = re.search(r'\b(PSA|BGS|SGC)\s*(\d+(?:\.\d+)?)\b', combined_text, re.IGNORECASE)
+        grade_match = _GRADE_RE.search(combined_lower)
         if grade_match:
             card_info["grading_company"] = grade_match.group(1).upper()
             card_info["grade"] = f"{card_info['grading_company']} {grade_match.group(2)}"
         
         # Extract card number
-        card_num_match = re.search(r'#(\d+)', combined_text)
+        card_num_match = _CARD_NUM_RE.search(combined_text)
         if card_num_match:
             card_info["card_number"] = card_num_match.group(1)
         
         # Check for rookie indicators
-        if any(word in combined_text.lower() for word in ['rookie', 'rc', 'rookie card']):
-            card_info["rookie"] = True
+        card_info["rookie"] = bool(_ROOKIE_RE.search(combined_lower))
         
         # Extract set name (more complex, often in header)
         set_name = self._extract_set_name(text_data.get("header", ""))
@@ -193,17 +312,17 @@ class WhatsnTCardDetector:
         auction_text = text_data.get("auction_details", "")
         
         # Extract current bid ($X.XX format)
-        bid_match = re.search(r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)', auction_text)
+        bid_match = _BID_RE.search(auction_text)
         if bid_match:
             auction_info["current_bid"] = float(bid_match.group(1).replace(",", ""))
         
         # Extract time remaining
-        time_match = re.search(r'(\d+[hm]|\d+:\d+)', auction_text)
+        time_match = _TIME_RE.search(auction_text)
         if time_match:
             auction_info["time_remaining"] = time_match.group(1)
         
         # Extract bid count
-        bid_count_match = re.search(r'(\d+)\s*bid', auction_text, re.IGNORECASE)
+        bid_count_match = _BID_COUNT_RE.search(auction_text.lower())
         if bid_count_match:
             auction_info["bid_count"] = int(bid_count_match.group(1))
             
@@ -211,66 +330,34 @@ class WhatsnTCardDetector:
     
     def _extract_player_name(self, text: str) -> Optional[str]:
         """Extract player name using common patterns"""
-        # Common player name patterns
-        patterns = [
-            r'\b([A-Z][a-z]+\s+[A-Z][a-z]+)\b',  # First Last
-            r'\b([A-Z]\.\s*[A-Z][a-z]+)\b',      # F. Last
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
+        for pattern in _PLAYER_PATTERNS:
+            matches = pattern.findall(text)
             for match in matches:
                 # Filter out common non-player words
-                if not any(word in match.lower() for word in ['psa', 'bgs', 'card', 'lot']):
+                if not _NAME_EXCLUDE_RE.search(match.lower()):
                     return match
         
         return None
     
     def _extract_set_name(self, text: str) -> Optional[str]:
         """Extract set name from header text"""
-        # Common set name patterns
-        common_sets = [
-            'topps', 'panini', 'upper deck', 'fleer', 'donruss', 'bowman',
-            'prizm', 'select', 'optic', 'mosaic', 'chronicles'
-        ]
-        
         text_lower = text.lower()
-        for set_name in common_sets:
-            if set_name in text_lower:
-                # Find the full set name context
-                idx = text_lower.find(set_name)
-                start = max(0, idx - 20)
-                end = min(len(text), idx + len(set_name) + 20)
-                context = text[start:end]
-                
-                # Extract the likely set name
-                set_match = re.search(rf'\b\w*{set_name}\w*\b', context, re.IGNORECASE)
-                if set_match:
-                    return set_match.group(0)
+        for idx, set_name in _find_set_names(text_lower):
+            # Find the full set name context
+            start = max(0, idx - 20)
+            end = min(len(text), idx + len(set_name) + 20)
+            context = text_lower[start:end]
+
+            # Extract the likely set name, in the original text's casing
+            set_match = _SET_WORD_RES[set_name].search(context)
+            if set_match:
+                return text[start + set_match.start():start + set_match.end()]
         
         return None
     
     def _calculate_detection_confidence(self, card_info: Dict, auction_info: Dict) -> float:
         """Calculate overall detection confidence"""
-        confidence = 0.0
-        
-        # Player name is crucial
-        if card_info.get("player_name"):
-            confidence += 0.4
-        
-        # Year adds significant confidence  
-        if card_info.get("year"):
-            confidence += 0.2
-        
-        # Grade information
-        if card_info.get("grade"):
-            confidence += 0.2
-        
-        # Current bid suggests active auction
-        if auction_info.get("current_bid", 0) > 0:
-            confidence += 0.2
-        
-        return min(confidence, 1.0)
+        return calculate_detection_confidence(card_info, auction_info)
 
 # Global instance
 whatsnot_detector = WhatsnTCardDetector()
\ No newline at end of file
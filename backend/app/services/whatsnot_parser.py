@@ -0,0 +1,228 @@
+"""Whatnot card / auction text parsing shared by the live and VOD pipelines."""
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from app.utils.pattern_scan import PatternScanner
+
+logger = logging.getLogger(__name__)
+
+# Parsing patterns — compiled once at import, not per frame
+COMMON_SETS = (
+    'topps', 'panini', 'upper deck', 'fleer', 'donruss', 'bowman',
+    'prizm', 'select', 'optic', 'mosaic', 'chronicles',
+)
+
+_YEAR_RE = re.compile(r'\b(19[5-9]\d|20[0-2]\d)\b')
+# Case-insensitive fields are matched against the lowercased text, not via IGNORECASE
+_GRADE_RE = re.compile(r'\b(psa|bgs|sgc)\s*(\d+(?:\.\d+)?)\b')
+_CARD_NUM_RE = re.compile(r'#(\d+)')
+_BID_RE = re.compile(r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)')
+_TIME_RE = re.compile(r'(\d+[hm]|\d+:\d+)')
+_BID_COUNT_RE = re.compile(r'(\d+)\s*bid')
+_PLAYER_RES = (
+    re.compile(r'\b([A-Z][a-z]+\s+[A-Z][a-z]+)\b'),
+    re.compile(r'\b([A-Z]\.\s*[A-Z][a-z]+)\b'),
+)
+# Name candidates containing any of these, even mid-word, are treated as UI text
+_NAME_DENY_RE = re.compile(r'psa|bgs|card|lot|bid|time', re.IGNORECASE)
+_SET_RES = {s: re.compile(rf'\b\w*{s}\w*\b', re.IGNORECASE) for s in COMMON_SETS}
+_ROOKIE_WORDS = ('rookie', 'rc')
+
+# Optional single-pass prefilter: Hyperscan scans the OCR text once for every
+# pattern above, and only the patterns that actually hit are re-run through `re`
+# to pull out capture groups. Without hyperscan every pattern runs as before.
+_SCANNER = PatternScanner("parsing", (
+    ("year", _YEAR_RE.pattern, False),
+    ("grade", _GRADE_RE.pattern, True),
+    ("card_number", _CARD_NUM_RE.pattern, False),
+    ("bid", _BID_RE.pattern, False),
+    ("time", _TIME_RE.pattern, False),
+    ("bid_count", _BID_COUNT_RE.pattern, True),
+    ("player", "|".join(p.pattern for p in _PLAYER_RES), False),
+    ("set", "|".join(COMMON_SETS), True),
+    ("rookie", r"rookie|rc", True),
+))
+
+# Default for the parsers' `hits` argument: None already means "no prefilter"
+_UNSCANNED: Any = object()
+
+# Optional Aho–Corasick automaton over the set-name and rookie keywords: one pass
+# over the lowercased text instead of a str.find per keyword.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _build_keyword_automaton():
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word in COMMON_SETS + _ROOKIE_WORDS:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AC = _build_keyword_automaton()
+
+
+@lru_cache(maxsize=256)
+def _parse_frame_text_cached(text: str) -> Tuple[Dict, Dict]:
+    # One lowercase copy and one prefilter scan shared by both parsers
+    text_lower = text.lower()
+    hits = _SCANNER.hits(text)
+    return (
+        parse_whatsnot_card_info(text, text_lower, hits),
+        parse_whatsnot_auction_info(text, text_lower, hits),
+    )
+
+
+def parse_frame_text(text: str) -> Tuple[Dict, Dict]:
+    """(card_info, auction_info) for `text`, memoised on the OCR text.
+
+    Cards sit on screen for seconds, so consecutive frames usually OCR to the same
+    string. Returns fresh copies — the pipeline mutates card_info downstream.
+    """
+    card_info, auction_info = _parse_frame_text_cached(text)
+    return dict(card_info), dict(auction_info)
+
+
+def parse_whatsnot_card_info(
+    text: str,
+    text_lower: Optional[str] = None,
+    hits: Optional[FrozenSet[str]] = _UNSCANNED,
+) -> Dict:
+    card_info: Dict = {
+        "player_name": "",
+        "year": "",
+        "set_name": "",
+        "card_number": "",
+        "grade": "",
+        "grading_company": "",
+        "rookie": False,
+    }
+    if text_lower is None:
+        text_lower = text.lower()
+    if hits is _UNSCANNED:
+        hits = _SCANNER.hits(text)
+
+    player_match = extract_player_name(text) if hits is None or "player" in hits else ""
+    if player_match:
+        card_info["player_name"] = player_match
+
+    year_match = _YEAR_RE.search(text) if hits is None or "year" in hits else None
+    if year_match:
+        card_info["year"] = year_match.group(1)
+
+    grade_match = _GRADE_RE.search(text_lower) if hits is None or "grade" in hits else None
+    if grade_match:
+        card_info["grading_company"] = grade_match.group(1).upper()
+        card_info["grade"] = f"{card_info['grading_company']} {grade_match.group(2)}"
+
+    card_num_match = _CARD_NUM_RE.search(text) if hits is None or "card_number" in hits else None
+    if card_num_match:
+        card_info["card_number"] = card_num_match.group(1)
+
+    keywords = _find_keywords(text_lower) if hits is None or hits & {"set", "rookie"} else {}
+    if any(w in keywords for w in _ROOKIE_WORDS):
+        card_info["rookie"] = True
+
+    set_name = extract_set_name(text, keywords) if keywords else ""
+    if set_name:
+        card_info["set_name"] = set_name
+
+    return card_info
+
+
+def parse_whatsnot_auction_info(
+    text: str,
+    text_lower: Optional[str] = None,
+    hits: Optional[FrozenSet[str]] = _UNSCANNED,
+) -> Dict:
+    auction_info: Dict = {
+        "current_bid": 0.0,
+        "time_remaining": "",
+        "bid_count": 0,
+        "seller": "",
+    }
+    if text_lower is None:
+        text_lower = text.lower()
+    if hits is _UNSCANNED:
+        hits = _SCANNER.hits(text)
+
+    bid_match = _BID_RE.search(text) if hits is None or "bid" in hits else None
+    if bid_match:
+        auction_info["current_bid"] = float(bid_match.group(1).replace(",", ""))
+
+    time_match = _TIME_RE.search(text) if hits is None or "time" in hits else None
+    if time_match:
+        auction_info["time_remaining"] = time_match.group(1)
+
+    bid_count_match = _BID_COUNT_RE.search(text_lower) if hits is None or "bid_count" in hits else None
+    if bid_count_match:
+        auction_info["bid_count"] = int(bid_count_match.group(1))
+
+    return auction_info
+
+
+def extract_player_name(text: str) -> str:
+    for pattern in _PLAYER_RES:
+        for match in pattern.findall(text):
+            if not _NAME_DENY_RE.search(match):
+                return match
+    return ""
+
+
+def _find_keywords(text_lower: str) -> Dict[str, int]:
+    """First start offset of each set-name / rookie keyword found in `text_lower`."""
+    found: Dict[str, int] = {}
+    if _KEYWORD_AC is None:
+        # str.find per keyword beats a single lookahead-alternation regex here:
+        # same offsets, but the regex measured ~3x slower on OCR-length text.
+        for word in COMMON_SETS + _ROOKIE_WORDS:
+            idx = text_lower.find(word)
+            if idx != -1:
+                found[word] = idx
+        return found
+    for end_idx, word in _KEYWORD_AC.iter(text_lower):
+        found.setdefault(word, end_idx - len(word) + 1)
+    return found
+
+
+def extract_set_name(text: str, keywords: Optional[Dict[str, int]] = None) -> str:
+    if keywords is None:
+        keywords = _find_keywords(text.lower())
+    for set_name in COMMON_SETS:
+        idx = keywords.get(set_name)
+        if idx is not None:
+            context = text[max(0, idx - 20):min(len(text), idx + len(set_name) + 20)]
+            m = _SET_RES[set_name].search(context)
+            if m:
+                return m.group(0)
+    return ""
+
+
+def calculate_detection_confidence(card_info: Dict, auction_info: Dict) -> float:
+    return aggregate_detection_confidence(
+        bool(card_info.get("player_name")),
+        bool(card_info.get("year")),
+        bool(card_info.get("grade")),
+        auction_info.get("current_bid", 0) > 0,
+    )
+
+
+def aggregate_detection_confidence(
+    has_player: bool, has_year: bool, has_grade: bool, has_bid: bool
+) -> float:
+    """Pure numeric core of calculate_detection_confidence (no dict access)."""
+    return _CONFIDENCE_TABLE[(has_player << 3) | (has_year << 2) | (has_grade << 1) | has_bid]
+
+
+# All 16 presence combinations, precomputed: player 0.4, year / grade / bid 0.2 each
+_CONFIDENCE_TABLE = tuple(
+    min(0.4 * (i >> 3 & 1) + 0.2 * (i >> 2 & 1) + 0.2 * (i >> 1 & 1) + 0.2 * (i & 1), 1.0)
+    for i in range(16)
+)
@@ -0,0 +1,14 @@
+import cv2
+import numpy as np
+
+
+def frame_dhash(frame: np.ndarray, hash_size: int = 8) -> int:
+    """64-bit difference hash of a frame: near-identical frames give near-identical hashes."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
@@ -0,0 +1,69 @@
+import logging
+from typing import FrozenSet, Optional, Sequence, Tuple
+
+# Optional: without hyperscan every scanner is disabled and callers run all of
+# their `re` patterns as usual.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+logger = logging.getLogger(__name__)
+
+
+class PatternScanner:
+    """Single-pass Hyperscan prefilter over a fixed set of named regex patterns.
+
+    `patterns` are (name, pattern, caseless) triples. `hits(text)` reports which
+    names occur in `text`, so callers only re-run those patterns through `re` for
+    their groups. Several patterns may share a name.
+    """
+
+    def __init__(self, label: str, patterns: Sequence[Tuple[str, str, bool]]):
+        self.label = label
+        self._names = [name for name, _, _ in patterns]
+        self._db = self._compile(patterns)
+
+    def _compile(self, patterns: Sequence[Tuple[str, str, bool]]):
+        if hyperscan is None:
+            return None
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[pattern.encode() for _, pattern, _ in patterns],
+                ids=list(range(len(patterns))),
+                flags=[
+                    hyperscan.HS_FLAG_SINGLEMATCH | (hyperscan.HS_FLAG_CASELESS if caseless else 0)
+                    for _, _, caseless in patterns
+                ],
+            )
+            logger.info("Hyperscan %s prefilter enabled", self.label)
+            return db
+        except Exception as e:
+            logger.warning("Hyperscan %s database build failed — using re only: %s", self.label, e)
+            return None
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    def hits(self, text: str) -> Optional[FrozenSet[str]]:
+        """Names of the patterns present in `text`, found in one pass.
+
+        Returns None when the scanner is disabled, meaning "assume every pattern may hit".
+        Non-ASCII text also returns None: the database is compiled in ASCII mode, where
+        word/space/boundary classes are narrower than Python's Unicode ones.
+        """
+        if self._db is None or not text.isascii():
+            return None
+        found = set()
+
+        def on_match(pattern_id, _start, _end, _flags, _ctx):
+            found.add(self._names[pattern_id])
+
+        try:
+            self._db.scan(text.encode("ascii"), match_event_handler=on_match)
+        except Exception as e:
+            logger.debug("Hyperscan %s scan failed, falling back to re: %s", self.label, e)
+            return None
+        return frozenset(found)
@@ -3,7 +3,7 @@ import React, { useState, useEffect, useCallback, useRef } from 'react';
 import socketService from './services/socketService';
 import StreamViewer from './components/StreamViewer';
 import AnalysisDisplay from './components/AnalysisDisplay';
-import { AnalysisResult, FrameData, SocketError } from './types';
+import { AnalysisResult, ClaudeAnalysis, FrameData, SocketError } from './types';
 import './App.css';
 
 const MOCK_RESULTS: AnalysisResult[] = [
@@ -410,6 +410,15 @@ const MOCK_RESULTS: AnalysisResult[] = [
   },
 ];
 
+// The "reasoning" field of a Claude response that is still streaming in as JSON
+const REASONING_RE = /"reasoning"\s*:\s*"((?:[^"\\]|\\.)*)/;
+
+function streamedReasoning(text: string): string {
+  const match = REASONING_RE.exec(text);
+  if (!match) return '';
+  return match[1].replace(/\\(.)/g, (_, c: string) => (c === 'n' ? '\n' : c));
+}
+
 function App() {
   const [isConnected, setIsConnected] = useState(false);
   const [isAnalyzing, setIsAnalyzing] = useState(false);
@@ -428,6 +437,9 @@ function App() {
   const [regionInputs, setRegionInputs] = useState({ top: 100, left: 100, width: 1200, height: 800 });
   const [showHistorySidebar, setShowHistorySidebar] = useState(false);
   const [selectedHistoryResult, setSelectedHistoryResult] = useState<AnalysisResult | null>(null);
+  // Claude's reply for the frame being analysed, ahead of its analysis_result
+  const [claudeStream, setClaudeStream] = useState<{ timestamp: number; text: string } | null>(null);
+  const [claudeDone, setClaudeDone] = useState<{ timestamp: number; analysis: ClaudeAnalysis } | null>(null);
 
   const handleFrameData = useCallback((data: FrameData) => {
     setFrameData(data);
@@ -435,11 +447,32 @@ function App() {
 
   const handleAnalysisResult = useCallback((result: AnalysisResult) => {
     setAnalysisResult(result);
-    setAnalysisHistory(prev => [result, ...prev.slice(0, 9)]);
+    // The result carries the final claude_analysis; drop the streamed copy
+    setClaudeStream(prev => (prev && prev.timestamp <= result.timestamp ? null : prev));
+    setClaudeDone(prev => (prev && prev.timestamp <= result.timestamp ? null : prev));
     setAudioActive(!!(result as any).audio_status?.is_active);
+    if (result.reused) {
+      // Same analysis re-sent for an unchanged screen: refresh the latest entry
+      setAnalysisHistory(prev => [result, ...prev.slice(1, 10)]);
+      return;
+    }
+    setAnalysisHistory(prev => [result, ...prev.slice(0, 9)]);
     setSelectedHistoryResult(null); // resume live view on new result
   }, []);
 
+  const handleClaudeChunk = useCallback((data: { text: string; timestamp: number }) => {
+    setClaudeStream(prev =>
+      prev && prev.timestamp === data.timestamp
+        ? { timestamp: data.timestamp, text: prev.text + data.text }
+        : { timestamp: data.timestamp, text: data.text }
+    );
+    setClaudeDone(prev => (prev && prev.timestamp < data.timestamp ? null : prev));
+  }, []);
+
+  const handleClaudeDone = useCallback((data: { claude_analysis: ClaudeAnalysis; timestamp: number }) => {
+    setClaudeDone({ timestamp: data.timestamp, analysis: data.claude_analysis });
+  }, []);
+
   const handleSocketError = useCallback((err: SocketError) => {
     setError(err.message);
     console.error('Socket error:', err.message);
@@ -479,6 +512,8 @@ function App() {
 
       socketService.onFrame(handleFrameData);
       socketService.onAnalysisResult(handleAnalysisResult);
+      socketService.onClaudeChunk(handleClaudeChunk);
+      socketService.onClaudeDone(handleClaudeDone);
       socketService.onError(handleSocketError);
       socketService.onSessionStarted((data) => {
         if (mounted) setSessionId(data.session_id);
@@ -501,7 +536,7 @@ function App() {
       mounted = false;
       socketService.disconnect();
     };
-  }, [handleFrameData, handleAnalysisResult, handleSocketError]);
+  }, [handleFrameData, handleAnalysisResult, handleClaudeChunk, handleClaudeDone, handleSocketError]);
 
   const handleStartAnalysis = useCallback(() => {
     if (!isConnected) { setError('Not connected to backend'); return; }
@@ -547,6 +582,10 @@ function App() {
   const analysisDisplayRef = useRef<HTMLDivElement>(null);
 
   const displayedResult = selectedHistoryResult ?? analysisResult;
+  // Live view only: reasoning for the frame still in flight, parsed once Claude is done
+  const pendingReasoning = selectedHistoryResult
+    ? null
+    : claudeDone?.analysis.reasoning ?? (claudeStream ? streamedReasoning(claudeStream.text) : null);
 
   // Scroll analysis panel to top whenever the displayed result changes
   useEffect(() => {
@@ -767,6 +806,7 @@ function App() {
             <AnalysisDisplay
               result={displayedResult}
               isAnalyzing={isAnalyzing && !selectedHistoryResult}
+              pendingReasoning={pendingReasoning}
             />
           </div>
 
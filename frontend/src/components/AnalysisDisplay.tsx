@@ -5,9 +5,23 @@ import { AnalysisResult } from '../types';
 interface Props {
   result: AnalysisResult | null;
   isAnalyzing: boolean;
+  // Claude's reasoning for a frame whose analysis_result hasn't arrived yet
+  pendingReasoning?: string | null;
 }
 
-const AnalysisDisplay: React.FC<Props> = ({ result, isAnalyzing }) => {
+const AnalysisDisplay: React.FC<Props> = ({ result, isAnalyzing, pendingReasoning }) => {
+  const reasoning = pendingReasoning || result?.claude_analysis?.reasoning;
+  const aiSection = reasoning ? (
+    <div className="analysis-section ai-section">
+      <div className="section-header">
+        <h3>AI Analysis</h3>
+      </div>
+      <div className="factor-item">
+        <span className="factor-text">{reasoning}</span>
+      </div>
+    </div>
+  ) : null;
+
   // Loading state
   if (!result && !isAnalyzing) {
     return (
@@ -42,6 +56,7 @@ const AnalysisDisplay: React.FC<Props> = ({ result, isAnalyzing }) => {
             <div className="step">ROI Calculation</div>
           </div>
         </div>
+        {aiSection}
       </div>
     );
   }
@@ -474,6 +489,8 @@ const AnalysisDisplay: React.FC<Props> = ({ result, isAnalyzing }) => {
         </div>
       )}
 
+      {aiSection}
+
       {/* Key Factors Section */}
       {roiAnalysis?.key_factors && roiAnalysis?.key_factors?.length > 0 && (
         <div className="analysis-section factors-section">
@@ -1,7 +1,8 @@
 import React, { useEffect, useRef } from 'react';
+import { FrameData } from '../types';
 
 export interface StreamViewerProps {
-  frameData: { image: string; timestamp: number } | null;
+  frameData: FrameData | null;
   isAnalyzing: boolean;
   regionSelected: boolean;
 }
@@ -14,13 +15,16 @@ const StreamViewer: React.FC<StreamViewerProps> = ({ frameData, isAnalyzing, reg
       const canvas = canvasRef.current;
       const ctx = canvas.getContext('2d');
       if (ctx) {
+        const url = URL.createObjectURL(new Blob([frameData.image], { type: 'image/jpeg' }));
         const img = new Image();
         img.onload = () => {
           canvas.width = img.width;
           canvas.height = img.height;
           ctx.drawImage(img, 0, 0);
+          URL.revokeObjectURL(url);
         };
-        img.src = frameData.image;
+        img.onerror = () => URL.revokeObjectURL(url);
+        img.src = url;
       }
     }
   }, [frameData]);
@@ -1,6 +1,6 @@
 // frontend/src/services/socketService.ts
 import io from 'socket.io-client';
-import { AnalysisResult } from '../types';
+import { AnalysisResult, ClaudeAnalysis, FrameData } from '../types';
 
 class SocketService {
   private socket: any = null;
@@ -52,7 +52,7 @@ class SocketService {
   }
 
   // Event listeners
-  onFrame(callback: (data: { image: string; timestamp: number }) => void): void {
+  onFrame(callback: (data: FrameData) => void): void {
     if (this.socket) {
       this.socket.on('frame', callback);
     }
@@ -64,6 +64,19 @@ class SocketService {
     }
   }
 
+  // Claude's recommendation text as it is generated, then the parsed result
+  onClaudeChunk(callback: (data: { text: string; timestamp: number }) => void): void {
+    if (this.socket) {
+      this.socket.on('claude_chunk', callback);
+    }
+  }
+
+  onClaudeDone(callback: (data: { claude_analysis: ClaudeAnalysis; timestamp: number }) => void): void {
+    if (this.socket) {
+      this.socket.on('claude_done', callback);
+    }
+  }
+
   onRegionSelected(callback: (data: { success: boolean; region?: any; message: string }) => void): void {
     if (this.socket) {
       this.socket.on('region_selected', callback);
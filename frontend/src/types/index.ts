@@ -1,8 +1,8 @@
 // frontend/src/types/index.ts
 
-// Basic frame data type
+// Basic frame data type — image is raw JPEG bytes (Socket.IO binary attachment)
 export interface FrameData {
-  image: string;
+  image: ArrayBuffer;
   timestamp: number;
 }
 
@@ -101,6 +101,14 @@ export interface MarketTrends {
   market_sentiment: 'bullish' | 'bearish' | 'neutral';
 }
 
+// Claude's deal recommendation (parsed JSON, or an error)
+export interface ClaudeAnalysis {
+  recommendation?: string;
+  confidence?: string;
+  reasoning?: string;
+  error?: string;
+}
+
 export interface AnalysisResult {
   // Core OCR data
   confidence: number;
@@ -117,11 +125,16 @@ export interface AnalysisResult {
   
   // Market trends and indicators
   market_trends: MarketTrends;
+
+  // Claude deal recommendation (also streamed ahead as claude_chunk / claude_done)
+  claude_analysis?: ClaudeAnalysis;
   
   // Metadata
   timestamp: number;
   processing_time: number;
   analysis_version: string;
+  // Set when the server re-sends the previous result for an unchanged screen
+  reused?: boolean;
 
   // Phase 2: audio
   audio_status?: {